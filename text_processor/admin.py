@@ -1,9 +1,35 @@
-from django.contrib import admin
-from .models.models import TextFile
+from django.contrib import admin, messages
+from .models.models import ProcessingBatch, TextFile
+from .services.batch_services import BatchDispatcher
 
 @admin.register(TextFile)
 class TextFileAdmin(admin.ModelAdmin):
     list_display = ('id', 'original_file', 'status', 'error_message', 'created_at', 'updated_at')
     list_filter = ('status',)
     search_fields = ('original_file', 'error_message')
+    actions = ['reprocess']
 
+    @admin.action(description='Reprocess selected files')
+    def reprocess(self, request, queryset):
+        # Evaluated first: the changelist filter may no longer match the reset files.
+        ids = list(queryset.values_list('id', flat=True))
+        batch = BatchDispatcher().reprocess(TextFile.objects.filter(id__in=ids), user=request.user, filters={'ids': ids})
+        skipped = len(ids) - batch.total_files
+        self.message_user(
+            request,
+            f"Reprocessing {batch.total_files} files as batch #{batch.id}"
+            + (f" ({skipped} pending or processing files skipped)." if skipped else "."),
+            messages.SUCCESS,
+        )
+
+
+@admin.register(ProcessingBatch)
+class ProcessingBatchAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'user', 'total_files', 'progress', 'created_at')
+    list_filter = ('kind',)
+    readonly_fields = ('kind', 'user', 'filters', 'total_files', 'progress', 'created_at')
+
+    @admin.display(description='Progress')
+    def progress(self, batch):
+        progress = BatchDispatcher.progress(batch)
+        return f"{progress['percent']}% ({progress['done']} done, {progress['failed']} failed)"
@@ -0,0 +1,44 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class ProcessingCancelled(Exception):
+    """
+    Raised inside a processor when the file being processed has been cancelled.
+
+    Processors check for cancellation periodically while streaming the file
+    and raise this exception to stop early. `BaseFileProcessor.process()`
+    handles it by removing the partial output and leaving the CANCELLED status
+    in place, so it never reaches the Celery task as a failure.
+    """
+
+
+class ResourceLimitExceeded(Exception):
+    """
+    Raised when a processing job exceeds one of its resource limits.
+
+    The limits (maximum line length, memory growth and wall time) are checked
+    inside the processing loop, so the job fails cleanly with this exception's
+    message as its `error_message` instead of being killed by the OS or Celery.
+    """
+
+
+class BudgetExceeded(ResourceLimitExceeded):
+    """
+    Raised when the whole job exceeds its memory or wall time budget.
+
+    Unlike an over-long line, which only concerns the part of the input that
+    contains it, this always fails the entire job, e.g. a whole ZIP archive
+    rather than just the member being processed.
+    """
+
+
+class UploadSessionClosed(APIException):
+    """
+    Raised when a chunk or finalize request reaches an upload session that has
+    been finalized or aborted in the meantime (e.g. by a concurrent request).
+    Responds with `409 Conflict`.
+    """
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "The upload has already been finalized or aborted."
+    default_code = 'upload_closed'
@@ -0,0 +1,89 @@
+import random
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from text_processor.utils.loadtest_utils import generate_text, parse_size
+from text_processor.utils.text_utils import shuffle_inner_letters, shuffle_text_line
+
+
+def split_join_shuffle(line):
+    """The previous `shuffle_text_line` implementation, kept as the benchmark baseline."""
+    return ' '.join(shuffle_inner_letters(word) for word in line.split())
+
+
+ENGINES = {
+    'split/join': split_join_shuffle,
+    'shuffle_text_line': shuffle_text_line,
+    'punctuation-aware': lambda line: shuffle_text_line(line, punctuation_aware=True),
+}
+
+
+class Command(BaseCommand):
+    """
+    Benchmarks the line shuffling engines on a text corpus.
+
+    Compares `shuffle_text_line` (in both word modes) with the previous
+    split/join implementation, on the given `.txt` files or directories,
+    or on generated text when no paths are given. Each engine processes the whole
+    corpus `--repeat` times; the best run is reported as throughput and relative
+    to split/join. No database or broker is used.
+
+    Example:
+        python manage.py benchmark_shuffle corpora/ --repeat 5
+    """
+
+    help = "Benchmark shuffle_text_line against the previous split/join implementation."
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help="Text files or directories (searched for *.txt) to use as corpus.")
+        parser.add_argument('--size', default='5MB',
+                            help="Size of the generated corpus when no paths are given (default: 5MB).")
+        parser.add_argument('--repeat', type=int, default=3, help="Runs per engine; the best is reported (default: 3).")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed for the corpus and shuffling.")
+
+    def handle(self, *args, **options):
+        lines = self._load_corpus(options)
+        if not lines:
+            raise CommandError("The corpus is empty.")
+        corpus_bytes = sum(len(line.encode('utf-8')) for line in lines)
+        self.stdout.write(f"Corpus: {len(lines)} lines, {corpus_bytes / 1024 / 1024:.1f} MB")
+
+        # Engines take turns in every round, so drift in machine load affects all of them alike.
+        results = {}
+        for _ in range(max(options['repeat'], 1)):
+            for name, engine in ENGINES.items():
+                random.seed(options['seed'])
+                started = time.perf_counter()
+                for line in lines:
+                    engine(line)
+                elapsed = time.perf_counter() - started
+                results[name] = min(results.get(name, elapsed), elapsed)
+
+        baseline = results['split/join']
+        self.stdout.write(f"{'engine':<28}{'best (s)':>10}{'MB/s':>10}{'vs split/join':>16}")
+        for name, elapsed in results.items():
+            self.stdout.write(
+                f"{name:<28}{elapsed:>10.3f}{corpus_bytes / 1024 / 1024 / elapsed:>10.1f}"
+                f"{baseline / elapsed:>15.2f}x"
+            )
+
+    def _load_corpus(self, options):
+        if not options['paths']:
+            rng = random.Random(options['seed'])
+            try:
+                size = parse_size(options['size'])
+            except ValueError as e:
+                raise CommandError(str(e))
+            return generate_text(size, rng).decode('utf-8').splitlines()
+
+        lines = []
+        for path in map(Path, options['paths']):
+            if not path.exists():
+                raise CommandError(f"Path '{path}' does not exist.")
+            files = sorted(path.rglob('*.txt')) if path.is_dir() else [path]
+            for file in files:
+                with open(file, encoding='utf-8', errors='replace') as f:
+                    lines.extend(line.rstrip('\n') for line in f)
+        return lines
@@ -0,0 +1,313 @@
+import contextlib
+import json
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+from celery.contrib.testing.worker import start_worker
+from celery.signals import before_task_publish, task_postrun, task_prerun
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from text_processor.models.file_status_choices import FileStatus
+from text_processor.models.models import TextFile
+from text_processor.tasks.tasks import process_file_task
+from text_processor.utils.loadtest_utils import generate_text, parse_size_mix, summarize
+
+TERMINAL_STATUSES = {FileStatus.DONE, FileStatus.FAILED, FileStatus.CANCELLED}
+
+
+class TaskTimings:
+    """
+    Collects Celery task publish/start/finish timestamps through Celery signals.
+
+    Signals are only delivered for tasks published and executed in this process,
+    so queue wait and processing times are available in the `inprocess` mode
+    (and processing times in the `eager` mode).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.published = {}
+        self.started = {}
+        self.finished = {}
+
+    def on_publish(self, sender=None, headers=None, **kwargs):
+        if sender == process_file_task.name and headers:
+            with self._lock:
+                self.published[headers["id"]] = time.perf_counter()
+
+    def on_prerun(self, sender=None, task_id=None, args=None, **kwargs):
+        if sender.name == process_file_task.name and args:
+            with self._lock:
+                self.started[task_id] = time.perf_counter()
+
+    def on_postrun(self, sender=None, task_id=None, **kwargs):
+        if sender.name == process_file_task.name:
+            with self._lock:
+                self.finished[task_id] = time.perf_counter()
+
+    @contextlib.contextmanager
+    def connected(self):
+        before_task_publish.connect(self.on_publish, weak=False)
+        task_prerun.connect(self.on_prerun, weak=False)
+        task_postrun.connect(self.on_postrun, weak=False)
+        try:
+            yield self
+        finally:
+            before_task_publish.disconnect(self.on_publish)
+            task_prerun.disconnect(self.on_prerun)
+            task_postrun.disconnect(self.on_postrun)
+
+    def queue_waits(self):
+        return [
+            self.started[task_id] - published
+            for task_id, published in self.published.items()
+            if task_id in self.started
+        ]
+
+    def processing_times(self):
+        return [
+            self.finished[task_id] - started
+            for task_id, started in self.started.items()
+            if task_id in self.finished
+        ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs an end-to-end load test: N concurrent clients upload generated files "
+        "through TextFileUploadView and poll TextFileDetailView until processing "
+        "finishes. Reports upload latency percentiles, queue wait, end-to-end "
+        "completion time and sustained throughput, and saves them as JSON. "
+        "Use --settings=text_shuffle.settings_loadtest to run against SQLite and an "
+        "in-memory Celery broker without any external services."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=4,
+                            help="Number of concurrent clients (default: 4).")
+        parser.add_argument("--files", type=int, default=100,
+                            help="Total number of files to upload (default: 100).")
+        parser.add_argument("--size-mix", default="1KB:70,100KB:25,1MB:5",
+                            help="Comma-separated SIZE:WEIGHT pairs of generated file sizes "
+                                 "(default: 1KB:70,100KB:25,1MB:5).")
+        parser.add_argument("--extension", default=".txt",
+                            help="Extension of the generated files (default: .txt).")
+        parser.add_argument("--celery", choices=["inprocess", "eager", "external"], default="inprocess",
+                            help="inprocess: start a Celery worker thread in this process; "
+                                 "eager: run tasks synchronously inside the upload request; "
+                                 "external: rely on separately running workers (default: inprocess).")
+        parser.add_argument("--worker-concurrency", type=int, default=1,
+                            help="Concurrency of the in-process worker (default: 1).")
+        parser.add_argument("--poll-interval", type=float, default=0.05,
+                            help="Seconds between status polls of a single client (default: 0.05).")
+        parser.add_argument("--timeout", type=float, default=300.0,
+                            help="Seconds a client waits for one file to finish (default: 300).")
+        parser.add_argument("--seed", type=int, default=None,
+                            help="Random seed for the file size mix and content.")
+        parser.add_argument("--output", default=None,
+                            help="Path of the JSON report "
+                                 "(default: loadtest_results/loadtest_<timestamp>.json).")
+        parser.add_argument("--keep-files", action="store_true",
+                            help="Keep the created TextFile records and their files.")
+
+    def handle(self, *args, **options):
+        try:
+            size_mix = parse_size_mix(options["size_mix"])
+        except ValueError as e:
+            raise CommandError(str(e))
+        if options["clients"] < 1 or options["files"] < 1:
+            raise CommandError("--clients and --files must be positive.")
+
+        if connection.vendor == "sqlite":
+            call_command("migrate", interactive=False, verbosity=0)
+
+        rng = random.Random(options["seed"])
+        sizes = rng.choices([size for size, _ in size_mix], weights=[weight for _, weight in size_mix],
+                            k=options["files"])
+        payloads = {size: generate_text(size, rng) for size in set(sizes)}
+
+        jobs = queue.Queue()
+        for index, size in enumerate(sizes):
+            jobs.put((index, size))
+
+        results = []
+        started_at = datetime.now(timezone.utc)
+        timings = TaskTimings()
+
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]), \
+                timings.connected(), self._celery(options):
+            run_start = time.perf_counter()
+            clients = [
+                threading.Thread(target=self._run_client, args=(jobs, payloads, options, results))
+                for _ in range(options["clients"])
+            ]
+            for client in clients:
+                client.start()
+            for client in clients:
+                client.join()
+            run_end = time.perf_counter()
+
+        report = self._build_report(options, started_at, sizes, results, timings, run_start, run_end)
+
+        output = options["output"] or os.path.join(
+            "loadtest_results", f"loadtest_{started_at:%Y%m%dT%H%M%SZ}.json"
+        )
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+        if not options["keep_files"]:
+            self._cleanup(result["file_id"] for result in results if result.get("file_id"))
+
+        self._print_report(report)
+        self.stdout.write(self.style.SUCCESS(f"Report saved to {output}"))
+
+    @contextlib.contextmanager
+    def _celery(self, options):
+        """Configures Celery for the selected mode for the duration of the run."""
+        app = process_file_task.app
+        if options["celery"] == "eager":
+            previous = app.conf.task_always_eager
+            app.conf.task_always_eager = True
+            try:
+                yield
+            finally:
+                app.conf.task_always_eager = previous
+        elif options["celery"] == "inprocess":
+            with start_worker(app, concurrency=options["worker_concurrency"], pool="threads",
+                              perform_ping_check=False, shutdown_timeout=options["timeout"]):
+                yield
+        else:
+            yield
+
+    def _run_client(self, jobs, payloads, options, results):
+        """Uploads files from the shared job queue and polls each one until it finishes."""
+        client = Client(raise_request_exception=False)
+        upload_url = reverse("file-upload")
+        try:
+            while True:
+                try:
+                    index, size = jobs.get_nowait()
+                except queue.Empty:
+                    return
+
+                upload = SimpleUploadedFile(f"loadtest_{index}{options['extension']}", payloads[size],
+                                            content_type="text/plain")
+                upload_start = time.perf_counter()
+                response = client.post(upload_url, {"original_file": upload})
+                upload_end = time.perf_counter()
+
+                result = {
+                    "size": size,
+                    "upload_start": upload_start,
+                    "upload_latency": upload_end - upload_start,
+                    "http_status": response.status_code,
+                }
+                results.append(result)
+                if response.status_code != 201:
+                    continue
+
+                result["file_id"] = response.json()["id"]
+                result.update(self._wait_for_completion(client, result["file_id"], upload_start, options))
+        finally:
+            connection.close()
+
+    def _wait_for_completion(self, client, file_id, upload_start, options):
+        detail_url = reverse("file-detail", args=[file_id])
+        deadline = upload_start + options["timeout"]
+        while time.perf_counter() < deadline:
+            file_status = client.get(detail_url).json()["status"]
+            if file_status in TERMINAL_STATUSES:
+                finished = time.perf_counter()
+                return {"status": file_status, "finished": finished, "completion_time": finished - upload_start}
+            time.sleep(options["poll_interval"])
+        return {"status": "timeout"}
+
+    def _build_report(self, options, started_at, sizes, results, timings, run_start, run_end):
+        completed = [r for r in results if r.get("status") == FileStatus.DONE]
+        finished = [r for r in results if "finished" in r]
+        window = (
+            max(r["finished"] for r in finished) - min(r["upload_start"] for r in results)
+            if finished else None
+        )
+        completed_bytes = sum(r["size"] for r in completed)
+
+        return {
+            "started_at": started_at.isoformat(),
+            "parameters": {
+                "clients": options["clients"],
+                "files": options["files"],
+                "size_mix": options["size_mix"],
+                "extension": options["extension"],
+                "celery": options["celery"],
+                "worker_concurrency": options["worker_concurrency"],
+                "seed": options["seed"],
+            },
+            "environment": {
+                "database": connection.vendor,
+                "broker": process_file_task.app.conf.broker_url.split("://")[0],
+            },
+            "files": {
+                "submitted": len(sizes),
+                "uploaded": sum(1 for r in results if r["http_status"] == 201),
+                "upload_errors": sum(1 for r in results if r["http_status"] != 201),
+                "done": len(completed),
+                "failed": sum(1 for r in results if r.get("status") == FileStatus.FAILED),
+                "timed_out": sum(1 for r in results if r.get("status") == "timeout"),
+                "bytes": sum(sizes),
+            },
+            "wall_time_s": run_end - run_start,
+            "upload_latency_s": summarize([r["upload_latency"] for r in results]),
+            "queue_wait_s": summarize(timings.queue_waits()),
+            "processing_time_s": summarize(timings.processing_times()),
+            "completion_time_s": summarize([r["completion_time"] for r in completed]),
+            "throughput": {
+                "files_per_s": len(completed) / window if window else None,
+                "mb_per_s": completed_bytes / window / 1024 ** 2 if window else None,
+            },
+        }
+
+    def _cleanup(self, file_ids):
+        for text_file in TextFile.objects.filter(id__in=list(file_ids)):
+            text_file.original_file.delete(save=False)
+            if text_file.result_file:
+                text_file.result_file.delete(save=False)
+            text_file.delete()
+
+    def _print_report(self, report):
+        files = report["files"]
+        self.stdout.write(
+            f"Files: {files['done']} done, {files['failed']} failed, {files['timed_out']} timed out, "
+            f"{files['upload_errors']} upload errors (of {files['submitted']}) "
+            f"in {report['wall_time_s']:.2f}s"
+        )
+        for key, label in (
+                ("upload_latency_s", "Upload latency"),
+                ("queue_wait_s", "Queue wait"),
+                ("processing_time_s", "Processing time"),
+                ("completion_time_s", "Completion time"),
+        ):
+            stats = report[key]
+            if not stats["count"]:
+                self.stdout.write(f"{label}: n/a")
+                continue
+            self.stdout.write(
+                f"{label}: p50={stats['p50'] * 1000:.1f}ms p95={stats['p95'] * 1000:.1f}ms "
+                f"p99={stats['p99'] * 1000:.1f}ms max={stats['max'] * 1000:.1f}ms"
+            )
+        throughput = report["throughput"]
+        if throughput["files_per_s"] is not None:
+            self.stdout.write(
+                f"Sustained throughput: {throughput['files_per_s']:.2f} files/s "
+                f"({throughput['mb_per_s']:.2f} MB/s)"
+            )
@@ -0,0 +1,163 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+
+from text_processor.models.models import TextFile
+from text_processor.processors.file_processor_factory import FileProcessorFactory
+from text_processor.utils.pipeline_utils import DEFAULT_PIPELINE, validate_pipeline
+from text_processor.utils.resource_utils import ProcessingLimits
+
+
+def _shuffle_files(jobs, pipeline, limits):
+    """
+    Process a chunk of files in a worker process.
+
+    Args:
+        jobs (list[tuple[str, str]]): (input path, output path) pairs.
+        pipeline (list[str]): Transform pipeline applied to every file.
+        limits (ProcessingLimits): Resource limits of every file.
+
+    Returns:
+        tuple[int, int, list[tuple[str, str]]]: Number of processed files, their total
+        input size in bytes, and (input path, error) pairs of the failed files.
+    """
+    processed, size, failures = 0, 0, []
+    for input_path, output_path in jobs:
+        try:
+            processor_cls = FileProcessorFactory.get_processor(os.path.splitext(input_path)[1])
+            # An unsaved TextFile: processors never query the database for it.
+            processor = processor_cls(TextFile(original_file=input_path, pipeline=pipeline), limits=limits)
+            processor.process_local(input_path, output_path)
+        except Exception as e:
+            failures.append((input_path, f"{type(e).__name__}: {e}"))
+        else:
+            processed += 1
+            size += os.path.getsize(input_path)
+    return processed, size, failures
+
+
+class Command(BaseCommand):
+    """
+    Processes a local directory tree offline, without HTTP, the database or Celery.
+
+    Walks `source`, picks the processor registered in `FileProcessorFactory` for
+    every file's extension and writes the result to the same relative path under
+    `destination`. Files are processed in chunks on a process pool. A result is
+    written to a temporary file and renamed when complete, so an interrupted run
+    can simply be started again: files whose result exists and is newer than the
+    source are skipped (unless `--force`). Files with unsupported extensions are
+    skipped, and failed files are reported without stopping the run.
+
+    Example:
+        python manage.py shuffle_dir /data/backfill /data/backfill-shuffled --workers 8
+    """
+
+    help = "Shuffle a local directory tree into a mirrored output tree using a process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help="Directory to process (searched recursively).")
+        parser.add_argument('destination', help="Directory the results are written to, mirroring the source tree.")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help="Number of worker processes (default: number of CPUs).")
+        parser.add_argument('--chunk-size', type=int, default=50,
+                            help="Files sent to a worker at a time (default: 50).")
+        parser.add_argument('--pipeline', nargs='+', default=DEFAULT_PIPELINE,
+                            help=f"Transform pipeline stages (default: {' '.join(DEFAULT_PIPELINE)}).")
+        parser.add_argument('--force', action='store_true', help="Reprocess files that already have a result.")
+
+    def handle(self, *args, **options):
+        source = os.path.abspath(options['source'])
+        destination = os.path.abspath(options['destination'])
+        if not os.path.isdir(source):
+            raise CommandError(f"Source directory '{source}' does not exist.")
+        if destination == source:
+            raise CommandError("The destination must be different from the source.")
+        if options['workers'] < 1 or options['chunk_size'] < 1:
+            raise CommandError("--workers and --chunk-size must be at least 1.")
+        try:
+            pipeline = validate_pipeline(options['pipeline'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        limits = ProcessingLimits.from_settings()
+
+        self.stats = {'processed': 0, 'bytes': 0, 'skipped': 0, 'unsupported': 0, 'failed': 0}
+        started = time.perf_counter()
+
+        chunks = self._chunks(self._jobs(source, destination, options['force']), options['chunk_size'])
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=django.setup) as executor:
+            pending = set()
+            for chunk in chunks:
+                pending.add(executor.submit(_shuffle_files, chunk, pipeline, limits))
+                # Keep the pool busy without queueing the whole tree in memory.
+                if len(pending) >= 2 * options['workers']:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    self._collect(done)
+            self._collect(pending)
+
+        self._report(time.perf_counter() - started)
+        if self.stats['failed']:
+            raise CommandError(f"{self.stats['failed']} files failed.")
+
+    def _jobs(self, source, destination, force):
+        """Yields (input path, output path) pairs of the files to process."""
+        for directory, subdirectories, filenames in os.walk(source):
+            # Never descend into the output tree if it is inside the source.
+            subdirectories[:] = sorted(
+                name for name in subdirectories if os.path.join(directory, name) != destination
+            )
+            output_directory = os.path.join(destination, os.path.relpath(directory, source))
+            for filename in sorted(filenames):
+                input_path = os.path.join(directory, filename)
+                output_path = os.path.join(output_directory, filename)
+                try:
+                    FileProcessorFactory.get_processor(os.path.splitext(filename)[1])
+                except ValueError:
+                    self.stats['unsupported'] += 1
+                    continue
+                if not force and self._is_done(input_path, output_path):
+                    self.stats['skipped'] += 1
+                    continue
+                os.makedirs(output_directory, exist_ok=True)
+                yield input_path, output_path
+
+    @staticmethod
+    def _is_done(input_path, output_path):
+        try:
+            return os.path.getmtime(output_path) >= os.path.getmtime(input_path)
+        except OSError:
+            return False
+
+    @staticmethod
+    def _chunks(jobs, size):
+        chunk = []
+        for job in jobs:
+            chunk.append(job)
+            if len(chunk) == size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _collect(self, futures):
+        for future in futures:
+            processed, size, failures = future.result()
+            self.stats['processed'] += processed
+            self.stats['bytes'] += size
+            self.stats['failed'] += len(failures)
+            for input_path, error in failures:
+                self.stderr.write(f"Failed: {input_path}: {error}")
+
+    def _report(self, elapsed):
+        stats = self.stats
+        elapsed = max(elapsed, 1e-6)
+        self.stdout.write(
+            f"Processed {stats['processed']} files ({stats['bytes'] / 1024 / 1024:.1f} MB) in {elapsed:.1f}s: "
+            f"{stats['processed'] / elapsed:.1f} files/s, {stats['bytes'] / 1024 / 1024 / elapsed:.1f} MB/s."
+        )
+        self.stdout.write(
+            f"Skipped {stats['skipped']} already processed and {stats['unsupported']} unsupported files; "
+            f"{stats['failed']} failed."
+        )
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('text_processor', '0002_textfile_task_id_cancelled_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='textfile',
+            name='file_size',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
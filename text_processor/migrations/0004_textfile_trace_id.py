@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('text_processor', '0003_textfile_file_size'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='textfile',
+            name='trace_id',
+            field=models.CharField(blank=True, db_index=True, max_length=32, null=True),
+        ),
+    ]
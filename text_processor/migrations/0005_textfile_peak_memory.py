@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('text_processor', '0004_textfile_trace_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='textfile',
+            name='peak_memory',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
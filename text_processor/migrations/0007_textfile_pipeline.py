@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:08
+
+import text_processor.utils.pipeline_utils
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('text_processor', '0006_processingbatch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='textfile',
+            name='pipeline',
+            field=models.JSONField(default=text_processor.utils.pipeline_utils.default_pipeline),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('text_processor', '0008_uploadsession'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='processingbatch',
+            name='kind',
+            field=models.CharField(choices=[('reprocess', 'Reprocess'), ('upload', 'Upload')], max_length=20),
+        ),
+    ]
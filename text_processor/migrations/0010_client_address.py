@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('text_processor', '0009_processingbatch_upload_kind'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processingbatch',
+            name='client_address',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='textfile',
+            name='client_address',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+    ]
@@ -0,0 +1,5 @@
+from django.db import models
+
+class BatchKind(models.TextChoices):
+    REPROCESS = 'reprocess', 'Reprocess'
+    UPLOAD = 'upload', 'Upload'
@@ -4,4 +4,5 @@ class FileStatus(models.TextChoices):
     PENDING = 'pending', 'Pending'
     PROCESSING = 'processing', 'Processing'
     DONE = 'done', 'Done'
-    FAILED = 'failed', 'Failed'
\ No newline at end of file
+    FAILED = 'failed', 'Failed'
+    CANCELLED = 'cancelled', 'Cancelled'
\ No newline at end of file
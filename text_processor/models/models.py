@@ -1,7 +1,38 @@
+import uuid
+
 from django.db import models
 from text_processor.models.file_status_choices import FileStatus
+from text_processor.models.batch_kind_choices import BatchKind
+from text_processor.utils.pipeline_utils import default_pipeline
 from django.conf import settings
 
+class ProcessingBatch(models.Model):
+    """
+    A group of files processed as one operation (a bulk reprocess or a multi-file upload).
+
+    The files of a batch point to it through `TextFile.batch`; the batch's
+    progress is aggregated from their statuses.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        related_name='processing_batches',
+        null=True,
+        blank=True
+    )
+    kind = models.CharField(max_length=20, choices=BatchKind.choices)
+    # Client address of an anonymous upload batch (see TextFile.client_address)
+    client_address = models.CharField(max_length=255, null=True, blank=True)
+    # Filter the files were selected with, kept for reference
+    filters = models.JSONField(default=dict, blank=True)
+    total_files = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.get_kind_display()} batch #{self.pk} ({self.total_files} files)"
+
+
 class TextFile(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -10,8 +41,14 @@ class TextFile(models.Model):
         null=True,
         blank=True
     )
+    # Address of the client that uploaded the file anonymously; anonymous jobs are
+    # scheduled per client address instead of as one shared user
+    client_address = models.CharField(max_length=255, null=True, blank=True)
     original_file = models.FileField(upload_to='uploads/')
     result_file = models.FileField(upload_to='results/', blank=True, null=True)
+    file_size = models.BigIntegerField(default=0)
+    # Names of the transforms applied to the text, in order (see utils.pipeline_utils)
+    pipeline = models.JSONField(default=default_pipeline)
 
     status = models.CharField(
         max_length=20,
@@ -20,6 +57,18 @@ class TextFile(models.Model):
     )
 
     error_message = models.TextField(null=True, blank=True)
+    task_id = models.CharField(max_length=255, null=True, blank=True)
+    trace_id = models.CharField(max_length=32, null=True, blank=True, db_index=True)
+    # Peak RSS (bytes) of the worker process observed while the file was processed
+    peak_memory = models.BigIntegerField(null=True, blank=True)
+    # Batch the file was last (re)processed in; batch files are dispatched by the BatchDispatcher
+    batch = models.ForeignKey(
+        ProcessingBatch,
+        on_delete=models.SET_NULL,
+        related_name='files',
+        null=True,
+        blank=True
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -27,3 +76,37 @@ class TextFile(models.Model):
         return f"{self.original_file.name} ({self.status})"
 
 
+class UploadSession(models.Model):
+    """
+    A resumable upload of a large file, sent in numbered chunks.
+
+    Chunks are written at their offsets into a staging file; `received` holds
+    the byte ranges received so far. The `TextFile` is only created (and queued
+    for processing) when the session is finalized after all bytes arrived.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions',
+        null=True,
+        blank=True
+    )
+    filename = models.CharField(max_length=255)
+    total_size = models.BigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    pipeline = models.JSONField(default=default_pipeline)
+    # Received byte ranges as sorted, non-overlapping [start, end) pairs
+    received = models.JSONField(default=list, blank=True)
+    text_file = models.OneToOneField(
+        TextFile,
+        on_delete=models.SET_NULL,
+        related_name='upload_session',
+        null=True,
+        blank=True
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.id})"
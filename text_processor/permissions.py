@@ -0,0 +1,15 @@
+from rest_framework import permissions
+
+
+class IsOwnerOrStaff(permissions.IsAuthenticated):
+    """
+    Allows access to authenticated users, and to an object only for its owner or staff.
+
+    The owner is the object's `user`. Objects without an owner (e.g. anonymous
+    uploads) are only accessible to staff.
+    """
+
+    def has_object_permission(self, request, view, obj):
+        if request.user.is_staff:
+            return True
+        return obj.user_id is not None and obj.user_id == request.user.id
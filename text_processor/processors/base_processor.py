@@ -1,7 +1,13 @@
 from django.db import transaction
-from abc import ABC, abstractmethod
-import os, uuid, logging
+from django.utils import timezone
+from abc import ABC
+from functools import cached_property
+import os, time, uuid, logging
+from text_processor.exceptions import ProcessingCancelled
 from text_processor.models.file_status_choices import FileStatus
+from text_processor.tracing import tracer
+from text_processor.utils.pipeline_utils import DEFAULT_PIPELINE, compile_pipeline
+from text_processor.utils.resource_utils import ProcessingLimits, ResourceBudget
 
 logger = logging.getLogger(__name__)
 
@@ -11,8 +17,14 @@ class BaseFileProcessor(ABC):
 
     This class defines a common processing workflow and enforces a unified interface
     for handling text-based files. It manages file status updates, error handling,
-    and output file generation. Subclasses must implement the `_process_file()` method,
-    which performs the actual transformation logic for a specific file type.
+    and output file generation. Subclasses must implement either `_process_stream()`
+    (text formats transformed from one open stream to another) or `_process_file()`
+    (formats that need full control over reading and writing the files).
+
+    Long-running processors call `_checkpoint()` periodically (directly or by iterating
+    through `_checkpoints()`), which stops processing early with `ProcessingCancelled`
+    once the file has been cancelled, and with `BudgetExceeded` once the job
+    exceeds its memory or wall time budget.
 
     Attributes:
         file_extension (str):
@@ -20,18 +32,49 @@ class BaseFileProcessor(ABC):
             by the processor (e.g. ".txt", ".csv"). Each subclass must provide
             a valid, non-empty string starting with a dot.
 
+        newline (str | None):
+            Newline mode used when the processor's text streams are opened
+            (see `open()`). Defaults to universal newlines; CSV processors use "".
+
+        checkpoint_interval (int):
+            Number of items (lines, rows, ...) yielded by `_checkpoints()` between
+            two calls to `_checkpoint()`.
+
+        cancel_check_interval (float):
+            Minimum number of seconds between two cancellation checks against the
+            database, which keeps `_checkpoint()` cheap for fast processors.
+
         text_file (TextFile):
             Instance of a Django model representing the file being processed.
             It must expose at least:
               - `original_file.path` — absolute path to the uploaded file.
-              - `status` and `error_message` — database fields updated during processing.
+              - `status`, `error_message` and `peak_memory` — database fields
+                updated during processing.
+              - `pipeline` — names of the transforms applied to the text
+                (optional, defaults to shuffling only).
+
+        limits (ProcessingLimits):
+            Resource limits of the job (line length, memory growth, wall time).
+
+        budget (ResourceBudget):
+            Tracks the job's memory and wall time against `limits` and records
+            the peak RSS observed while processing.
+
+        parent (BaseFileProcessor | None):
+            Processor of the container (e.g. ZIP archive) this processor handles a
+            member of. Checkpoints are delegated to it, so all members share the
+            container's budget and cancellation throttle.
 
     Raises:
         TypeError:
-            If a subclass does not define a valid `file_extension`.
+            If a subclass does not define a valid `file_extension`, or overrides
+            neither `_process_stream()` nor `_process_file()`.
     """
 
     file_extension: str = None
+    newline: str = None
+    checkpoint_interval: int = 1000
+    cancel_check_interval: float = 1.0
 
     def __init_subclass__(cls, **kwargs):
         """
@@ -43,11 +86,15 @@ class BaseFileProcessor(ABC):
           - Start with a dot ('.').
           - Have at least one character after the dot.
 
+        Also ensures that the subclass implements at least one of
+        `_process_stream()` or `_process_file()`.
+
         Args:
             **kwargs: Optional keyword arguments passed during subclass creation.
 
         Raises:
-            TypeError: If `file_extension` is missing or invalid.
+            TypeError: If `file_extension` is missing or invalid, or no processing
+                method is implemented.
         """
         super().__init_subclass__(**kwargs)
         ext = getattr(cls, "file_extension", None)
@@ -56,33 +103,138 @@ class BaseFileProcessor(ABC):
                 f"{cls.__name__} must define a valid 'file_extension' "
                 f"(e.g. '.txt', '.csv'), got: {ext!r}"
             )
+        if (
+            cls._process_stream is BaseFileProcessor._process_stream
+            and cls._process_file is BaseFileProcessor._process_file
+        ):
+            raise TypeError(
+                f"{cls.__name__} must implement '_process_stream()' or '_process_file()'"
+            )
 
-    def __init__(self, text_file):
+    def __init__(self, text_file, limits=None, parent=None):
         """
         Initialize the processor with a given TextFile instance.
 
         Args:
             text_file (TextFile): Django model instance representing the file
                 to be processed.
+            limits (ProcessingLimits, optional): Resource limits of the job.
+                Defaults to `ProcessingLimits()`, which only bounds line chunk sizes.
+            parent (BaseFileProcessor, optional): Container processor this
+                processor handles a member for.
         """
         self.text_file = text_file
+        self.parent = parent
+        self.limits = limits or ProcessingLimits()
+        self.budget = ResourceBudget(self.limits)
+        self._last_cancel_check = time.monotonic()
+
+    @cached_property
+    def transform(self):
+        """
+        The file's transform pipeline compiled into a single function.
+
+        Processors apply it to each line, line chunk or cell, so all transforms
+        run in one streaming pass. It is compiled on first use, inside `process()`,
+        so an invalid pipeline fails the file like any other processing error.
+        """
+        return compile_pipeline(getattr(self.text_file, 'pipeline', None) or DEFAULT_PIPELINE)
 
     def _update_status(self, status, error_message=None):
         """
         Safely update the file's processing status in the database.
 
         This method uses a transaction to avoid partial updates. It also truncates
-        the error message to 500 characters to fit the database field.
+        the error message to 500 characters to fit the database field, and records
+        the peak memory observed so far. A file that has been cancelled keeps its
+        CANCELLED status: the update is skipped.
 
         Args:
             status (FileStatus): New status to assign (e.g. PROCESSING, DONE, FAILED).
             error_message (str, optional): Description of an error if applicable.
+
+        Returns:
+            bool: True if the status was updated, False if the file was cancelled.
         """
         self.text_file.status = status
         if error_message:
             self.text_file.error_message = error_message[:500]
-        with transaction.atomic():
-            self.text_file.save(update_fields=['status', 'error_message'])
+        self.budget.sample()
+        self.text_file.peak_memory = self.budget.peak_rss
+        with tracer.span('status.update', status=str(status)), transaction.atomic():
+            updated = (
+                type(self.text_file)._default_manager
+                .filter(pk=self.text_file.pk)
+                .exclude(status=FileStatus.CANCELLED)
+                .update(
+                    status=status,
+                    error_message=self.text_file.error_message,
+                    peak_memory=self.text_file.peak_memory,
+                    updated_at=timezone.now(),
+                )
+            )
+        if not updated:
+            self.text_file.status = FileStatus.CANCELLED
+        return bool(updated)
+
+    def _is_cancelled(self):
+        """
+        Check whether the file has been cancelled since processing started.
+
+        Returns:
+            bool: True if the file's status in the database is CANCELLED.
+            Files that are not stored in the database are never cancelled.
+        """
+        if getattr(self.text_file, "pk", None) is None:
+            return False
+        return (
+            type(self.text_file)._default_manager
+            .filter(pk=self.text_file.pk, status=FileStatus.CANCELLED)
+            .exists()
+        )
+
+    def _checkpoint(self):
+        """
+        Stop processing if the file has been cancelled or the job is over its budget.
+
+        The database is queried at most once per `cancel_check_interval` seconds,
+        so this method can be called as often as every few lines. Member processors
+        delegate to their `parent`, so even short members are checked against the
+        container's throttle instead of each starting a fresh interval.
+
+        Raises:
+            BudgetExceeded: If the job exceeded its memory or wall time limit.
+            ProcessingCancelled: If the file has been cancelled.
+        """
+        if self.parent is not None:
+            return self.parent._checkpoint()
+        self.budget.check()
+        now = time.monotonic()
+        if now - self._last_cancel_check < self.cancel_check_interval:
+            return
+        self._last_cancel_check = now
+        if self._is_cancelled():
+            raise ProcessingCancelled(f"Processing of file {self.text_file.id} was cancelled")
+
+    def _checkpoints(self, items):
+        """
+        Yield items from `items`, calling `_checkpoint()` every `checkpoint_interval` items.
+
+        Args:
+            items (Iterable): Lines, rows or blocks being processed.
+
+        Yields:
+            Each item of `items`, unchanged.
+
+        Raises:
+            ProcessingCancelled: If the file is cancelled while iterating.
+            BudgetExceeded: If the job exceeds its budget while iterating.
+        """
+        interval = self.checkpoint_interval
+        for count, item in enumerate(items, 1):
+            if count % interval == 0:
+                self._checkpoint()
+            yield item
 
     def process(self):
         """
@@ -95,9 +247,11 @@ class BaseFileProcessor(ABC):
           4. Delegate processing to `_process_file()`.
           5. On success, mark the file as DONE and return the relative result path.
           6. On error, mark the file as FAILED and log the exception.
+          7. On cancellation, remove the partial output and keep the CANCELLED status.
 
         Returns:
-            str: Relative path to the processed result file (e.g. "results/result_123.csv").
+            str | None: Relative path to the processed result file (e.g. "results/result_123.csv"),
+            or None if the file was cancelled.
 
         Raises:
             Exception: Any exception raised by `_process_file()` is re-raised
@@ -110,26 +264,92 @@ class BaseFileProcessor(ABC):
         output_filename = f"result_{self.text_file.id}_{uuid.uuid4()}{self.file_extension}"
         output_path = os.path.join(output_dir, output_filename)
 
-        self._update_status(FileStatus.PROCESSING)
+        if not self._update_status(FileStatus.PROCESSING):
+            logger.info(f"File {self.text_file.id} was cancelled before processing started.")
+            return None
 
         try:
-            self._process_file(input_path, output_path)
-            self._update_status(FileStatus.DONE)
+            with tracer.span('transform', file_id=self.text_file.id, processor=type(self).__name__):
+                self._process_file(input_path, output_path)
+            if not self._update_status(FileStatus.DONE):
+                raise ProcessingCancelled(f"File {self.text_file.id} was cancelled during processing")
             return f"results/{output_filename}"
 
+        except ProcessingCancelled as e:
+            logger.info(f"{e}, discarding partial output.")
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            return None
+
         except Exception as e:
             logger.exception(f"Processing failed for file {self.text_file.id}: {e}")
             self._update_status(FileStatus.FAILED, str(e))
             raise
 
-    @abstractmethod
+    def process_local(self, input_path, output_path):
+        """
+        Process a file on local disk without touching the database.
+
+        Used for offline batch runs (`manage.py shuffle_dir`): no status is recorded,
+        and `text_file` (which need not be saved) only provides the pipeline. The
+        output is written to `<output_path>.part` and renamed once complete, so an
+        existing `output_path` is always a finished result.
+
+        Args:
+            input_path (str): Path to the input file.
+            output_path (str): Path where the processed output is saved.
+
+        Raises:
+            Exception: Any processing error; the partial output is removed first.
+        """
+        partial_path = f"{output_path}.part"
+        try:
+            self._process_file(input_path, partial_path)
+            os.replace(partial_path, output_path)
+        except BaseException:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+
+    @property
+    def supports_streams(self):
+        """
+        Whether this processor can transform text streams via `_process_stream()`.
+
+        Container formats (e.g. ZIP archives) use this to decide whether a member
+        can be processed in memory, without being extracted to disk first.
+        """
+        return type(self)._process_stream is not BaseFileProcessor._process_stream
+
+    def _process_stream(self, infile, outfile):
+        """
+        Transform an open text stream into another open text stream.
+
+        Text-based processors should implement this method instead of
+        `_process_file()`: the default `_process_file()` opens both paths
+        as UTF-8 text (using the class `newline` mode) and delegates here,
+        and container processors can feed it archive members directly.
+
+        Args:
+            infile (TextIO): Text stream to read from.
+            outfile (TextIO): Text stream to write the processed data to.
+
+        Raises:
+            NotImplementedError: If the processor does not support streams.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support stream processing"
+        )
+
     def _process_file(self, input_path, output_path):
         """
         Process the content of a single file.
 
-        Subclasses must implement this method to define how the file should
-        be transformed. The implementation is responsible for reading from
-        `input_path` and writing the processed data to `output_path`.
+        The default implementation opens `input_path` and `output_path` as UTF-8
+        text streams and delegates to `_process_stream()`. Subclasses that need
+        full control over reading and writing (e.g. binary or container formats)
+        override this method instead. The implementation is responsible for
+        reading from `input_path` and writing the processed data to `output_path`.
 
         Args:
             input_path (str): Absolute path to the input file.
@@ -138,4 +358,6 @@ class BaseFileProcessor(ABC):
         Raises:
             Exception: Implementations should raise exceptions to signal processing failures.
         """
-        pass
+        with open(input_path, "r", encoding="utf-8", newline=self.newline) as infile, \
+             open(output_path, "w", encoding="utf-8", newline=self.newline) as outfile:
+            self._process_stream(infile, outfile)
@@ -1,25 +1,15 @@
 import csv
-import os
-import uuid
-import logging
-from text_processor.models.file_status_choices import FileStatus
-from text_processor.processors.base_processor import BaseFileProcessor
-from text_processor.utils.text_utils import shuffle_text_line
-
-logger = logging.getLogger(__name__)
-
-import csv
-from text_processor.utils.text_utils import shuffle_text_line
 from text_processor.processors.base_processor import BaseFileProcessor
+from text_processor.utils.text_utils import bounded_line_reader
 
 class CSVFileProcessor(BaseFileProcessor):
     file_extension = ".csv"
-
-    def _process_file(self, input_path, output_path):
-        with open(input_path, "r", encoding="utf-8", newline="") as infile, \
-             open(output_path, "w", encoding="utf-8", newline="") as outfile:
-            reader = csv.reader(infile)
-            writer = csv.writer(outfile)
-            for row in reader:
-                processed_row = [shuffle_text_line(cell) for cell in row]
-                writer.writerow(processed_row)
+    newline = ""
+
+    def _process_stream(self, infile, outfile):
+        reader = csv.reader(bounded_line_reader(infile, self.limits.max_line_length))
+        writer = csv.writer(outfile)
+        transform = self.transform
+        for row in self._checkpoints(reader):
+            processed_row = [transform(cell) for cell in row]
+            writer.writerow(processed_row)
@@ -23,8 +23,9 @@ class FileProcessorFactory:
             module = importlib.import_module(f"text_processor.processors.{module_name}")
             for attr_name in dir(module):
                 attr = getattr(module, attr_name)
+                # type() avoids evaluating lazy objects (e.g. django.conf.settings)
                 if (
-                        isinstance(attr, type)
+                        issubclass(type(attr), type)
                         and issubclass(attr, BaseFileProcessor)
                         and attr is not BaseFileProcessor
                         and getattr(attr, "file_extension", None)
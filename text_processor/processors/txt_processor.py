@@ -1,12 +1,12 @@
-import io
-from text_processor.utils.text_utils import line_generator, shuffle_text_line
+from text_processor.utils.text_utils import line_chunk_generator
 from text_processor.processors.base_processor import BaseFileProcessor
 
 class TxtFileProcessor(BaseFileProcessor):
     file_extension = ".txt"
 
-    def _process_file(self, input_path, output_path):
-        with io.open(input_path, 'r', encoding='utf-8') as infile, \
-             io.open(output_path, 'w', encoding='utf-8') as outfile:
-            for processed_line in line_generator(infile, shuffle_text_line):
-                outfile.write(processed_line)
+    def _process_stream(self, infile, outfile):
+        # Very long lines are read and transformed in pieces instead of being loaded whole.
+        chunks = line_chunk_generator(infile, self.limits.line_chunk_size, self.limits.max_line_length)
+        transform = self.transform
+        for text, separator in self._checkpoints(chunks):
+            outfile.write(transform(text) + separator)
@@ -0,0 +1,193 @@
+import contextvars
+import io
+import json
+import logging
+import os
+import shutil
+import tempfile
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+
+from text_processor.exceptions import BudgetExceeded, ProcessingCancelled
+from text_processor.processors.base_processor import BaseFileProcessor
+from text_processor.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class ZipFileProcessor(BaseFileProcessor):
+    """
+    Processor for ZIP archives containing other supported files (TXT, CSV, ...).
+
+    Every archive member is streamed through the processor registered for its
+    extension, without extracting anything to disk. Members are processed
+    concurrently on a thread pool; each result is buffered in a spooled temporary
+    file (kept in memory up to `spool_max_size` bytes) and written into the result
+    archive as soon as it is ready, in the original member order. At most
+    `2 * max_workers` members are in flight at any time, which bounds memory use
+    for archives with hundreds of members. The pool overlaps decompression,
+    compression and I/O (zlib releases the GIL), but the shuffling itself is pure
+    Python and holds the GIL, so it gives no CPU parallelism: CPU-bound bulk work
+    scales with more Celery worker processes (or `manage.py shuffle_dir`), not
+    with `max_workers`. Member threads run in a copy of the submitting context,
+    so their spans belong to the file's trace.
+
+    A member that cannot be processed (unsupported extension, nested archive,
+    decoding error, ...) does not fail the whole archive: it is left out of the
+    result, and all such failures are listed in an `_errors.json` member of the
+    result archive (`_errors_1.json`, ... if the archive already has a member of
+    that name) and summarised in the file's `error_message`. Cancelling the
+    file stops the whole archive: members check for cancellation like regular
+    files, and no new member is started once the cancellation is noticed.
+    Likewise, members are checked against the job's memory and wall time
+    budget, and a job over its budget fails as a whole; only an over-long line
+    is a failure of its member.
+
+    Attributes:
+        max_workers (int | None):
+            Number of members processed concurrently. Defaults to the
+            `ZIP_PROCESSOR_MAX_WORKERS` setting.
+        spool_max_size (int | None):
+            Size in bytes above which a processed member is spooled to a temporary
+            file instead of memory. Defaults to the `ZIP_PROCESSOR_SPOOL_MAX_SIZE` setting.
+    """
+
+    file_extension = ".zip"
+    errors_member_name = "_errors.json"
+
+    max_workers: int = None
+    spool_max_size: int = None
+
+    def _process_file(self, input_path, output_path):
+        max_workers = self.max_workers or settings.ZIP_PROCESSOR_MAX_WORKERS
+        errors = {}
+
+        with zipfile.ZipFile(input_path) as zin, \
+             zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_DEFLATED) as zout, \
+             ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="zip-member") as pool:
+            members = [info for info in zin.infolist() if not info.is_dir()]
+            errors_name = self._errors_member_name({info.filename for info in zin.infolist()})
+            in_flight = deque()
+
+            try:
+                for info in members:
+                    self._checkpoint()
+                    # A fresh context copy per member: one context cannot be entered by two threads at once.
+                    future = pool.submit(contextvars.copy_context().run, self._process_member, zin, info)
+                    in_flight.append((info, future))
+                    if len(in_flight) >= 2 * max_workers:
+                        self._write_member(zout, *in_flight.popleft(), errors)
+
+                while in_flight:
+                    self._write_member(zout, *in_flight.popleft(), errors)
+            except (ProcessingCancelled, BudgetExceeded):
+                # The job stops as a whole: don't start the members still queued.
+                for _, future in in_flight:
+                    future.cancel()
+                raise
+
+            if errors:
+                zout.writestr(errors_name, json.dumps(errors, indent=2))
+
+        if errors:
+            self.text_file.error_message = (
+                f"{len(errors)} of {len(members)} archive members failed, "
+                f"see '{errors_name}' in the result archive."
+            )[:500]
+
+    def _errors_member_name(self, names):
+        """
+        Name of the errors member that does not collide with any of the archive's `names`.
+
+        Returns:
+            str: `errors_member_name`, or `<stem>_<n><ext>` for the first free `n`.
+        """
+        name = self.errors_member_name
+        stem, ext = os.path.splitext(name)
+        n = 0
+        while name in names:
+            n += 1
+            name = f"{stem}_{n}{ext}"
+        return name
+
+    def _process_member(self, zin, info):
+        """
+        Process a single archive member with the processor registered for its extension.
+
+        Args:
+            zin (zipfile.ZipFile): Archive opened for reading.
+            info (zipfile.ZipInfo): Member to process.
+
+        Returns:
+            tuple: Spooled temporary file holding the processed member (rewound
+            to the beginning) and its size in bytes.
+
+        Raises:
+            ValueError: If no stream-capable processor is registered for the member.
+            Exception: Any exception raised by the member's processor.
+        """
+        # Imported here: the factory imports this module during autodiscovery.
+        from text_processor.processors.file_processor_factory import FileProcessorFactory
+
+        _, ext = os.path.splitext(info.filename)
+        processor = FileProcessorFactory.get_processor(ext)(self.text_file, limits=self.limits, parent=self)
+        if not processor.supports_streams:
+            raise ValueError(f"Files with extension '{ext.lower()}' are not supported inside archives")
+
+        spool_max_size = self.spool_max_size or settings.ZIP_PROCESSOR_SPOOL_MAX_SIZE
+        spool = tempfile.SpooledTemporaryFile(max_size=spool_max_size)
+        try:
+            with tracer.span('zip.member', member=info.filename), zin.open(info) as raw_in:
+                infile = io.TextIOWrapper(raw_in, encoding="utf-8", newline=processor.newline)
+                outfile = io.TextIOWrapper(spool, encoding="utf-8", newline=processor.newline)
+                processor._process_stream(infile, outfile)
+                outfile.flush()
+                outfile.detach()
+                infile.detach()
+        except Exception:
+            spool.close()
+            raise
+        finally:
+            if getattr(self.text_file, "pk", None) is not None:
+                # Cancellation checks of member processors open a connection in this pool thread.
+                connections.close_all()
+
+        size = spool.tell()
+        spool.seek(0)
+        return spool, size
+
+    def _write_member(self, zout, info, future, errors):
+        """
+        Wait for a member's result and append it to the output archive.
+
+        Failures are recorded in `errors` (member name -> message) instead of
+        being raised, so one broken member does not fail the whole archive.
+        Cancellation and an exceeded job budget are re-raised, as they stop
+        the whole job.
+
+        Args:
+            zout (zipfile.ZipFile): Archive opened for writing.
+            info (zipfile.ZipInfo): Original member the result belongs to.
+            future (concurrent.futures.Future): Future returned for `_process_member()`.
+            errors (dict): Mapping collecting per-member error messages.
+        """
+        try:
+            spool, size = future.result()
+        except (ProcessingCancelled, BudgetExceeded):
+            raise
+        except Exception as e:
+            logger.warning(
+                f"Archive member '{info.filename}' of file {self.text_file.id} failed: {e}"
+            )
+            errors[info.filename] = str(e)
+            return
+
+        out_info = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+        out_info.compress_type = zipfile.ZIP_DEFLATED
+        out_info.file_size = size  # lets zipfile decide upfront whether ZIP64 is needed
+        with spool, zout.open(out_info, "w") as dst:
+            shutil.copyfileobj(spool, dst)
@@ -0,0 +1,67 @@
+from django.conf import settings
+from rest_framework import serializers
+from text_processor.models.file_status_choices import FileStatus
+from text_processor.models.models import ProcessingBatch
+from text_processor.services.batch_services import BatchDispatcher
+from text_processor.services.scheduling_services import UNFINISHED_STATUSES
+from text_processor.utils.validator_utils import validate_file_extension, validate_pipeline_stages
+
+
+class ProcessingBatchSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ProcessingBatch
+        fields = ['id', 'user', 'kind', 'filters', 'total_files', 'progress', 'created_at']
+        read_only_fields = fields
+
+    def get_progress(self, batch):
+        return BatchDispatcher.progress(batch)
+
+
+class ReprocessFilterSerializer(serializers.Serializer):
+    """
+    Filter selecting the files of a bulk reprocess. At least one criterion is required,
+    and all given criteria must match.
+    """
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    status = serializers.ListField(
+        child=serializers.ChoiceField(choices=[s for s in FileStatus.choices if s[0] not in UNFINISHED_STATUSES]),
+        required=False,
+        allow_empty=False,
+    )
+    user = serializers.IntegerField(required=False)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError("Provide at least one filter.")
+        return attrs
+
+    def filter_queryset(self, queryset):
+        """Returns `queryset` restricted to the files matching the validated filter."""
+        lookups = {
+            'ids': 'id__in',
+            'status': 'status__in',
+            'user': 'user_id',
+            'created_after': 'created_at__gte',
+            'created_before': 'created_at__lt',
+        }
+        return queryset.filter(**{lookups[name]: value for name, value in self.validated_data.items()})
+
+
+class BatchUploadSerializer(serializers.Serializer):
+    """
+    Many files uploaded in one multipart request, sent as repeated `files` fields.
+    Every file is validated with `validate_file_extension`; errors are reported per file index.
+    """
+    files = serializers.ListField(
+        child=serializers.FileField(validators=[validate_file_extension]),
+        allow_empty=False,
+        max_length=settings.BATCH_UPLOAD_MAX_FILES,
+    )
+    pipeline = serializers.ListField(child=serializers.CharField(), required=False)
+
+    def validate_pipeline(self, pipeline):
+        return validate_pipeline_stages(pipeline)
@@ -1,17 +1,24 @@
 from rest_framework import serializers
 from text_processor.models.models import TextFile
-from text_processor.utils.validator_utils import validate_file_extension
+from text_processor.utils.validator_utils import validate_file_extension, validate_pipeline_stages
 
 
 class TextFileSerializer(serializers.ModelSerializer):
+    # In multipart uploads, the stages are sent as repeated `pipeline` fields.
+    pipeline = serializers.ListField(child=serializers.CharField(), required=False)
+
     class Meta:
         model = TextFile
-        fields = ['id', 'user', 'original_file', 'result_file', 'status', 'updated_at', 'error_message']
-        read_only_fields = ['user', 'result_file', 'status']
+        fields = ['id', 'user', 'original_file', 'pipeline', 'file_size', 'result_file', 'status', 'updated_at', 'error_message',
+                  'trace_id', 'peak_memory']
+        read_only_fields = ['user', 'file_size', 'result_file', 'status', 'trace_id', 'peak_memory']
 
     def create(self, validated_data):
         user = self.context['request'].user if self.context['request'].user.is_authenticated else None
-        return TextFile.objects.create(user=user, **validated_data)
+        return TextFile.objects.create(user=user, file_size=validated_data['original_file'].size, **validated_data)
 
     def validate_original_file(self, original_file):
         return validate_file_extension(original_file)
+
+    def validate_pipeline(self, pipeline):
+        return validate_pipeline_stages(pipeline)
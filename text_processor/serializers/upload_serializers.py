@@ -0,0 +1,40 @@
+from django.conf import settings
+from rest_framework import serializers
+from text_processor.models.models import UploadSession
+from text_processor.utils.upload_utils import missing_chunks, received_bytes
+from text_processor.utils.validator_utils import validate_filename_extension, validate_pipeline_stages
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    pipeline = serializers.ListField(child=serializers.CharField(), required=False)
+    received_bytes = serializers.SerializerMethodField()
+    missing_chunks = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'filename', 'total_size', 'chunk_size', 'pipeline', 'received', 'received_bytes',
+                  'missing_chunks', 'text_file', 'created_at']
+        read_only_fields = ['chunk_size', 'received', 'text_file']
+
+    def create(self, validated_data):
+        user = self.context['request'].user if self.context['request'].user.is_authenticated else None
+        return UploadSession.objects.create(user=user, chunk_size=settings.UPLOAD_CHUNK_SIZE, **validated_data)
+
+    def validate_filename(self, filename):
+        return validate_filename_extension(filename)
+
+    def validate_total_size(self, total_size):
+        if total_size <= 0:
+            raise serializers.ValidationError("The file must not be empty.")
+        if settings.UPLOAD_MAX_SIZE and total_size > settings.UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(f"Files larger than {settings.UPLOAD_MAX_SIZE} bytes are not accepted.")
+        return total_size
+
+    def validate_pipeline(self, pipeline):
+        return validate_pipeline_stages(pipeline)
+
+    def get_received_bytes(self, session):
+        return received_bytes(session.received)
+
+    def get_missing_chunks(self, session):
+        return missing_chunks(session.received, session.total_size, session.chunk_size)
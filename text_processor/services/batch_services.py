@@ -0,0 +1,320 @@
+import logging
+import time
+from datetime import timedelta
+
+from celery import group
+from celery.utils import uuid
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import CharField, Count, Q, Value
+from django.db.models.functions import Cast, Concat, LPad
+from django.utils import timezone
+
+from text_processor.models.batch_kind_choices import BatchKind
+from text_processor.models.file_status_choices import FileStatus
+from text_processor.models.models import ProcessingBatch, TextFile
+from text_processor.services.scheduling_services import UNFINISHED_STATUSES, FairScheduler
+from text_processor.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class BatchDispatcher:
+    """
+    Creates processing batches and sends their files to Celery in rate-limited chunks.
+
+    A reprocess batch is started with a single bulk `UPDATE` that resets its files
+    to `pending` and attaches them to the batch; an upload batch inserts all of its
+    files with a single `bulk_create`. The files are then not dispatched by the
+    `FairScheduler`; instead `dispatch_batch_task` publishes them as Celery groups
+    of at most `chunk_size` tasks and re-schedules itself every `dispatch_interval`
+    seconds until the whole batch is sent. At most `max_in_flight` files of a batch
+    are queued or processing at the same time, so a batch of thousands of files
+    never floods the broker and other jobs keep moving. Upload batches are also
+    kept within their owner's `PROCESSING_MAX_ACTIVE_JOBS_PER_USER`, shared with
+    the owner's single uploads, so a batch upload gets no more worker slots than
+    uploading the files one by one. The `FairScheduler` dispatches waiting files
+    of upload batches as well, so a slot freed by a finished job is refilled at
+    once instead of on the next `run()`.
+
+    Each `run()` marks the batch as alive by touching its `updated_at`. If the
+    self-rescheduling chain breaks (the first schedule after commit or a later
+    re-schedule failed, e.g. because the broker was down), `sweep()`, run
+    periodically by Celery beat, restarts batches that still have waiting files
+    but have not been run for `BATCH_DISPATCH_STALE_AFTER` seconds.
+
+    Tunables fall back to the `BATCH_DISPATCH_*` settings when left as None;
+    a `max_in_flight` of 0 disables the in-flight limit.
+    """
+
+    chunk_size = None
+    dispatch_interval = None
+    max_in_flight = None
+
+    def __init__(self):
+        if self.chunk_size is None:
+            self.chunk_size = settings.BATCH_DISPATCH_CHUNK_SIZE
+        if self.dispatch_interval is None:
+            self.dispatch_interval = settings.BATCH_DISPATCH_INTERVAL
+        if self.max_in_flight is None:
+            self.max_in_flight = settings.BATCH_MAX_IN_FLIGHT
+
+    def reprocess(self, queryset, user=None, filters=None):
+        """
+        Reset the files in `queryset` and reprocess them as one batch.
+
+        Files that are still pending or processing are left out, as they are
+        already on their way to a worker. The selected files are reset with one
+        bulk `UPDATE`, which also gives every file a new trace ID (a new trace per
+        processing run). Their previous result files are deleted and dispatching
+        starts once the transaction commits.
+
+        Args:
+            queryset (QuerySet): `TextFile` records to reprocess.
+            user (User | None): User who started the batch.
+            filters (dict, optional): Filter the files were selected with, stored on the batch.
+
+        Returns:
+            ProcessingBatch: The new batch.
+        """
+        user = user if user is not None and user.is_authenticated else None
+        selected = queryset.exclude(status__in=UNFINISHED_STATUSES)
+        with transaction.atomic():
+            batch = ProcessingBatch.objects.create(user=user, kind=BatchKind.REPROCESS, filters=filters or {})
+            old_results = list(
+                selected.exclude(result_file='').exclude(result_file=None).values_list('result_file', flat=True)
+            )
+            batch.total_files = selected.update(
+                status=FileStatus.PENDING,
+                error_message=None,
+                result_file=None,
+                task_id=None,
+                peak_memory=None,
+                # "<random prefix><zero-padded file ID>": 32 hex digits like `tracer.new_trace_id()`.
+                trace_id=Concat(
+                    Value(tracer.new_trace_id()[:16]), LPad(Cast('id', CharField()), 16, Value('0')),
+                    output_field=CharField(),
+                ),
+                batch=batch,
+                updated_at=timezone.now(),
+            )
+            batch.save(update_fields=['total_files'])
+            transaction.on_commit(lambda: self._delete_results(old_results), robust=True)
+            # If scheduling fails here, `sweep()` starts the batch later.
+            transaction.on_commit(lambda: self.schedule(batch), robust=True)
+
+        logger.info(f"Batch ID={batch.id} created to reprocess {batch.total_files} files.")
+        return batch
+
+    def upload(self, files, user=None, pipeline=None, client_address=None):
+        """
+        Store many uploaded files as one batch and start processing them.
+
+        All `TextFile` rows are inserted with one `bulk_create` (the uploaded
+        content is written to the media storage as part of it), and the first
+        chunk of the batch is dispatched as a Celery group right away. If that
+        fails (e.g. the broker is down), the batch is still returned: its files
+        stay waiting and `sweep()` dispatches them later.
+
+        Args:
+            files (list[UploadedFile]): Validated uploaded files.
+            user (User | None): Owner of the files.
+            pipeline (list[str], optional): Transform pipeline of all files.
+            client_address (str, optional): Client address of an anonymous upload
+                (see `FairScheduler.client_address()`).
+
+        Returns:
+            ProcessingBatch: The new batch.
+        """
+        user = user if user is not None and user.is_authenticated else None
+        client_address = client_address if user is None else None
+        extra = {'pipeline': pipeline} if pipeline else {}
+        with transaction.atomic():
+            batch = ProcessingBatch.objects.create(user=user, client_address=client_address, kind=BatchKind.UPLOAD,
+                                                   total_files=len(files))
+            with tracer.span('upload.write', batch_id=batch.id, files=len(files)):
+                TextFile.objects.bulk_create([
+                    # Every file gets its own trace, as with single uploads.
+                    TextFile(user=user, client_address=client_address, original_file=f, file_size=f.size,
+                             trace_id=tracer.new_trace_id(), batch=batch, **extra)
+                    for f in files
+                ])
+
+        logger.info(f"Batch ID={batch.id} created for {len(files)} uploaded files.")
+        try:
+            self.run(batch)
+        except Exception as e:
+            # The files are stored; the periodic sweep dispatches them once it can.
+            logger.warning(f"Could not start batch ID={batch.id}, it is left to the sweep: {e}")
+        return batch
+
+    def schedule(self, batch, countdown=0):
+        """Schedule `dispatch_batch_task` for `batch` in `countdown` seconds."""
+        # Imported here: the task module imports this service.
+        from text_processor.tasks.tasks import dispatch_batch_task
+
+        dispatch_batch_task.apply_async(args=[batch.id], countdown=countdown)
+
+    def run(self, batch):
+        """
+        Dispatch the next chunk of `batch` and schedule the following one.
+
+        Called by `dispatch_batch_task`. If the batch is at its in-flight limit
+        or publishing fails, nothing is sent and the next attempt is scheduled
+        after `dispatch_interval` seconds.
+
+        Args:
+            batch (ProcessingBatch): Batch to dispatch.
+
+        Returns:
+            int: Number of files dispatched.
+        """
+        ProcessingBatch.objects.filter(pk=batch.pk).update(updated_at=timezone.now())
+        try:
+            dispatched = self.dispatch_chunk(batch)
+        except Exception as e:
+            logger.warning(f"Could not dispatch batch ID={batch.id}, retrying in {self.dispatch_interval}s: {e}")
+            dispatched = 0
+
+        if self._waiting(batch).exists():
+            try:
+                self.schedule(batch, countdown=self.dispatch_interval)
+            except Exception as e:
+                logger.warning(f"Could not schedule batch ID={batch.id}, it is left to the sweep: {e}")
+        else:
+            logger.info(f"Batch ID={batch.id} fully dispatched.")
+        return dispatched
+
+    def sweep(self):
+        """
+        Restart batches whose dispatch chain has stopped while files are still waiting.
+
+        Called periodically by `sweep_batches_task`. A batch counts as stopped
+        when it has not been run for `BATCH_DISPATCH_STALE_AFTER` seconds.
+
+        Returns:
+            int: Number of restarted batches.
+        """
+        stale = timezone.now() - timedelta(seconds=settings.BATCH_DISPATCH_STALE_AFTER)
+        batches = ProcessingBatch.objects.filter(
+            updated_at__lt=stale, files__status=FileStatus.PENDING, files__task_id__isnull=True,
+        ).distinct()
+        restarted = 0
+        for batch in batches:
+            logger.warning(f"Batch ID={batch.id} has waiting files but stopped dispatching, restarting it.")
+            self.run(batch)
+            restarted += 1
+        return restarted
+
+    def dispatch_chunk(self, batch):
+        """
+        Publish up to `chunk_size` waiting files of `batch` as one Celery group,
+        within the batch's in-flight limit and, for upload batches, the owner's
+        free processing slots.
+
+        The files are claimed with one conditional `UPDATE` that gives each of them
+        its task ID, so a file is never dispatched twice. If publishing fails,
+        the claims are released and the exception is re-raised.
+
+        Args:
+            batch (ProcessingBatch): Batch to dispatch.
+
+        Returns:
+            int: Number of files dispatched.
+        """
+        # Imported here: the task module imports this service.
+        from text_processor.tasks.tasks import process_file_task
+
+        room = self.chunk_size
+        if self.max_in_flight:
+            in_flight = batch.files.filter(
+                Q(status=FileStatus.PENDING, task_id__isnull=False) | Q(status=FileStatus.PROCESSING)
+            ).count()
+            room = min(room, self.max_in_flight - in_flight)
+        if batch.kind == BatchKind.UPLOAD:
+            free_slots = FairScheduler().free_slots(batch.user_id, batch.client_address)
+            if free_slots is not None:
+                room = min(room, free_slots)
+        if room <= 0:
+            return 0
+
+        ids = list(self._waiting(batch).order_by('id').values_list('id', flat=True)[:room])
+        if not ids:
+            return 0
+
+        # Task IDs are "<chunk prefix><file ID>", set for the whole chunk in one UPDATE.
+        prefix = f"{uuid()}-"
+        TextFile.objects.filter(pk__in=ids, status=FileStatus.PENDING, task_id__isnull=True).update(
+            task_id=Concat(Value(prefix), Cast('id', CharField()), output_field=CharField())
+        )
+        claimed = TextFile.objects.filter(pk__in=ids, task_id__startswith=prefix)
+        jobs = list(claimed.values_list('id', 'task_id', 'trace_id'))
+        if not jobs:
+            return 0
+
+        try:
+            # Each file's trace continues in its task, as for files sent by the FairScheduler.
+            enqueued_at = time.time()
+            group(
+                process_file_task.signature(
+                    args=[file_id],
+                    task_id=task_id,
+                    headers={'trace_id': trace_id, 'enqueued_at': enqueued_at},
+                )
+                for file_id, task_id, trace_id in jobs
+            ).apply_async()
+        except Exception:
+            claimed.update(task_id=None)
+            raise
+
+        logger.info(f"Dispatched {len(jobs)} files of batch ID={batch.id}.")
+        return len(jobs)
+
+    @staticmethod
+    def progress(batch):
+        """
+        Progress of `batch`, aggregated from the statuses of its files.
+
+        The aggregate `status` is `pending` until a file of the batch starts,
+        `processing` while files are unfinished, and once all are finished
+        `done` (no failures), `failed` (no file done), `partially_failed`
+        or `cancelled` (every file cancelled).
+
+        Returns:
+            dict: The aggregate `status`, the number of `total`, `pending`,
+            `processing`, `done`, `failed` and `cancelled` files, the `percent`
+            of finished files, and whether the batch is `finished`.
+        """
+        counts = batch.files.aggregate(
+            **{value: Count('id', filter=Q(status=value)) for value in FileStatus.values}
+        )
+        total = sum(counts.values())
+        unfinished = sum(counts[value] for value in UNFINISHED_STATUSES)
+        if unfinished:
+            status = FileStatus.PENDING if counts[FileStatus.PENDING] == total else FileStatus.PROCESSING
+        elif counts[FileStatus.FAILED]:
+            status = 'partially_failed' if counts[FileStatus.DONE] else FileStatus.FAILED
+        elif counts[FileStatus.DONE] or not total:
+            status = FileStatus.DONE
+        else:
+            status = FileStatus.CANCELLED
+        return {
+            'status': str(status),
+            'total': total,
+            **counts,
+            'percent': round(100 * (total - unfinished) / total, 1) if total else 100.0,
+            'finished': unfinished == 0,
+        }
+
+    @staticmethod
+    def _delete_results(names):
+        for name in names:
+            try:
+                default_storage.delete(name)
+            except OSError as e:
+                logger.warning(f"Could not delete previous result file '{name}': {e}")
+
+    @staticmethod
+    def _waiting(batch):
+        return batch.files.filter(status=FileStatus.PENDING, task_id__isnull=True)
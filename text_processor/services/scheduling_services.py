@@ -0,0 +1,284 @@
+import logging
+import time
+from collections import deque
+from datetime import timedelta
+
+from celery.utils import uuid
+from django.conf import settings
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import BaseThrottle
+
+from text_processor.models.batch_kind_choices import BatchKind
+from text_processor.models.file_status_choices import FileStatus
+from text_processor.models.models import TextFile
+from text_processor.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Jobs that still occupy the queue: accepted but not finished yet.
+UNFINISHED_STATUSES = [FileStatus.PENDING, FileStatus.PROCESSING]
+
+
+class FairScheduler:
+    """
+    Admission control and fair dispatching of processing jobs.
+
+    Accepted files wait in the database (status `pending`, no `task_id`) instead of
+    being sent to the broker right away. `dispatch()` moves them to Celery while
+    keeping at most `PROCESSING_MAX_ACTIVE_JOBS_PER_USER` jobs per user in the
+    broker or on workers, and interleaves users round-robin (users with the fewest
+    active jobs first). A user who uploads thousands of files therefore only ever
+    occupies a few worker slots, and other users' jobs are not stuck behind them.
+    Anonymous uploads are told apart by their client address (see
+    `client_address()`): every address is scheduled like a user of its own, so
+    one anonymous client cannot starve all other anonymous users.
+    Files of upload batches are dispatched here too, like single uploads, so a slot
+    freed by a finished job is refilled right away whichever kind of upload is
+    waiting; the `BatchDispatcher` additionally sends their first chunk as a group
+    (within `free_slots()`). Files of reprocess batches are only dispatched by the
+    rate-limited `BatchDispatcher`.
+
+    `check_admission()` rejects uploads with `429 Too Many Requests` and a
+    `Retry-After` header when the global queue depth or queued bytes, or the
+    user's (or anonymous client's) queued bytes, would exceed their limits.
+
+    `dispatch()` runs after every upload, cancellation and finished job, and
+    periodically from Celery beat (`dispatch_pending_task`), which also calls
+    `recover_stale()` so jobs of killed workers do not hold their owner's slots.
+
+    Limits come from the `PROCESSING_*` settings; a limit of 0 disables it.
+    The per-user active job limit is a soft limit: concurrent dispatchers may
+    briefly exceed it, but a job is never dispatched twice.
+    """
+
+    #: Maximum number of waiting jobs dispatched per user by one `dispatch()` call
+    #: when the per-user active job limit is disabled.
+    max_dispatch_per_user = 100
+
+    @staticmethod
+    def client_address(request):
+        """
+        Address anonymous jobs of `request` are scheduled by.
+
+        Uses the same client identification as DRF throttling, which trusts the
+        last `NUM_PROXIES` entries of `X-Forwarded-For` (the connection's address
+        when `NUM_PROXIES` is 0).
+
+        Returns:
+            str | None: The client's address, or None for authenticated users,
+            whose jobs are scheduled by user.
+        """
+        if request.user.is_authenticated:
+            return None
+        return BaseThrottle().get_ident(request)
+
+    def check_admission(self, user, size, count=1, client_address=None):
+        """
+        Check whether `count` new jobs of `size` bytes in total can be accepted for `user`.
+
+        A single job is always accepted when nothing is queued yet, even if it is
+        larger than a byte limit, so large files cannot be rejected forever.
+
+        Args:
+            user (User | None): Owner of the new jobs (None for anonymous uploads).
+            size (int): Size of the uploaded files in bytes.
+            count (int): Number of new jobs (files of a batch upload).
+            client_address (str | None): Client address of anonymous uploads.
+
+        Raises:
+            Throttled: If accepting the jobs would exceed a queue limit.
+        """
+        unfinished = TextFile.objects.filter(status__in=UNFINISHED_STATUSES)
+
+        totals = self._totals(unfinished)
+        max_depth = settings.PROCESSING_MAX_QUEUE_DEPTH
+        if max_depth and totals['jobs'] + count > max_depth:
+            self._throttle("The processing queue is full.")
+        max_bytes = settings.PROCESSING_MAX_QUEUED_BYTES
+        if max_bytes and totals['bytes'] and totals['bytes'] + size > max_bytes:
+            self._throttle("Too much data is queued for processing.")
+
+        user_totals = self._totals(unfinished.filter(self._user_q(user, client_address)))
+        max_user_bytes = settings.PROCESSING_MAX_QUEUED_BYTES_PER_USER
+        if max_user_bytes and user_totals['bytes'] and user_totals['bytes'] + size > max_user_bytes:
+            self._throttle("You have too much data queued for processing.")
+
+    def dispatch(self):
+        """
+        Send waiting jobs to Celery, fairly interleaved between users.
+
+        Each job is claimed by setting its `task_id` with a conditional update
+        before it is published, so concurrent dispatchers never send the same job
+        twice. If publishing fails, the claim is released and the job keeps waiting.
+
+        Returns:
+            int: Number of dispatched jobs.
+        """
+        limit = settings.PROCESSING_MAX_ACTIVE_JOBS_PER_USER
+        waiting = TextFile.objects.filter(
+            Q(batch__isnull=True) | Q(batch__kind=BatchKind.UPLOAD), status=FileStatus.PENDING, task_id__isnull=True
+        )
+        # Owners are users, or the client addresses of anonymous uploads.
+        owners = set(waiting.values_list('user_id', 'client_address').distinct())
+        if not owners:
+            return 0
+
+        active = {
+            (user_id, client_address): jobs
+            for user_id, client_address, jobs in self._active().values('user_id', 'client_address')
+            .annotate(jobs=Count('id')).values_list('user_id', 'client_address', 'jobs')
+        }
+
+        queues = []
+        for owner in sorted(owners, key=lambda o: active.get(o, 0)):
+            slots = limit - active.get(owner, 0) if limit else self.max_dispatch_per_user
+            if slots <= 0:
+                continue
+            jobs = (
+                waiting.filter(self._owner_q(*owner))
+                .order_by('created_at', 'id')
+                .values_list('id', 'trace_id')[:slots]
+            )
+            if jobs:
+                queues.append(deque(jobs))
+
+        dispatched = 0
+        while queues:
+            for queue in list(queues):
+                if not self._dispatch_job(*queue.popleft()):
+                    return dispatched
+                dispatched += 1
+                if not queue:
+                    queues.remove(queue)
+        return dispatched
+
+    def free_slots(self, user_id, client_address=None):
+        """
+        Number of further jobs of the user with ID `user_id` that may be sent to workers now.
+
+        Args:
+            user_id (int | None): ID of the user (None for anonymous uploads).
+            client_address (str | None): Client address of anonymous uploads.
+
+        Returns:
+            int | None: Free slots under `PROCESSING_MAX_ACTIVE_JOBS_PER_USER`
+            (0 or less when none are free), or None if the limit is disabled.
+        """
+        limit = settings.PROCESSING_MAX_ACTIVE_JOBS_PER_USER
+        if not limit:
+            return None
+        return limit - self._active().filter(self._owner_q(user_id, client_address)).count()
+
+    def recover_stale(self):
+        """
+        Fail jobs that have been `processing` for longer than `PROCESSING_STALE_TIMEOUT` seconds.
+
+        A worker that is killed (SIGKILL, out of memory, ...) never updates its
+        file, which would then count as an active job of its owner forever. The
+        timeout must exceed `PROCESSING_MAX_WALL_TIME`, after which a live job
+        stops by itself. The files are failed rather than requeued, so a file that
+        kills its worker is not retried endlessly; it can be reprocessed explicitly.
+
+        Returns:
+            int: Number of recovered jobs.
+        """
+        timeout = settings.PROCESSING_STALE_TIMEOUT
+        if not timeout:
+            return 0
+        now = timezone.now()
+        recovered = TextFile.objects.filter(
+            status=FileStatus.PROCESSING, updated_at__lt=now - timedelta(seconds=timeout)
+        ).update(
+            status=FileStatus.FAILED,
+            error_message=f"Processing did not finish within {timeout} seconds, the worker was probably lost.",
+            updated_at=now,
+        )
+        if recovered:
+            logger.warning(f"Marked {recovered} stale processing jobs as failed.")
+        return recovered
+
+    def stats(self, user=None, client_address=None):
+        """
+        Current queue counts, globally and for `user`.
+
+        Args:
+            user (User | None): User whose own counts are included (None for anonymous).
+            client_address (str | None): Client address whose counts are included for anonymous users.
+
+        Returns:
+            dict: `global` and `user` sections with the number of waiting, active
+            and processing jobs and the queued bytes, plus the configured `limits`.
+        """
+        return {
+            'global': self._counts(TextFile.objects.all()),
+            'user': self._counts(TextFile.objects.filter(self._user_q(user, client_address))),
+            'limits': {
+                'max_active_jobs_per_user': settings.PROCESSING_MAX_ACTIVE_JOBS_PER_USER,
+                'max_queued_bytes_per_user': settings.PROCESSING_MAX_QUEUED_BYTES_PER_USER,
+                'max_queue_depth': settings.PROCESSING_MAX_QUEUE_DEPTH,
+                'max_queued_bytes': settings.PROCESSING_MAX_QUEUED_BYTES,
+            },
+        }
+
+    def _dispatch_job(self, file_id, trace_id):
+        # Imported here: the task module imports this service.
+        from text_processor.tasks.tasks import process_file_task
+
+        task_id = uuid()
+        claimed = TextFile.objects.filter(
+            pk=file_id, status=FileStatus.PENDING, task_id__isnull=True
+        ).update(task_id=task_id)
+        if not claimed:
+            return True
+
+        try:
+            with tracer.trace(trace_id), tracer.span('enqueue', file_id=file_id, task_id=task_id):
+                # The trace ID and publish time travel with the message for queue-wait tracing.
+                process_file_task.apply_async(
+                    args=[file_id],
+                    task_id=task_id,
+                    headers={'trace_id': trace_id, 'enqueued_at': time.time()},
+                )
+        except Exception as e:
+            logger.warning(f"Could not dispatch file ID={file_id}, it stays queued: {e}")
+            TextFile.objects.filter(pk=file_id, task_id=task_id).update(task_id=None)
+            return False
+        return True
+
+    def _active(self):
+        """Jobs sent to the broker or running on a worker."""
+        return TextFile.objects.filter(
+            Q(status=FileStatus.PENDING, task_id__isnull=False) | Q(status=FileStatus.PROCESSING)
+        )
+
+    def _counts(self, queryset):
+        return queryset.aggregate(
+            waiting=Count('id', filter=Q(status=FileStatus.PENDING, task_id__isnull=True)),
+            active=Count('id', filter=Q(status=FileStatus.PENDING, task_id__isnull=False)
+                     | Q(status=FileStatus.PROCESSING)),
+            processing=Count('id', filter=Q(status=FileStatus.PROCESSING)),
+            queued_bytes=Coalesce(Sum('file_size', filter=Q(status__in=UNFINISHED_STATUSES)), 0),
+        )
+
+    @staticmethod
+    def _totals(queryset):
+        return queryset.aggregate(jobs=Count('id'), bytes=Coalesce(Sum('file_size'), 0))
+
+    @classmethod
+    def _user_q(cls, user, client_address=None):
+        if user is None or not user.is_authenticated:
+            return cls._owner_q(None, client_address)
+        return Q(user=user)
+
+    @staticmethod
+    def _owner_q(user_id, client_address):
+        if user_id is not None:
+            return Q(user_id=user_id)
+        return Q(user__isnull=True, client_address=client_address)
+
+    @staticmethod
+    def _throttle(detail):
+        raise Throttled(wait=settings.PROCESSING_RETRY_AFTER, detail=f"{detail} Please retry later.")
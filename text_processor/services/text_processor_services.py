@@ -1,6 +1,8 @@
 import os
 import logging
 from text_processor.processors.file_processor_factory import FileProcessorFactory
+from text_processor.tracing import tracer
+from text_processor.utils.resource_utils import ProcessingLimits
 
 logger = logging.getLogger(__name__)
 
@@ -17,18 +19,21 @@ class TextProcessingService:
         """
         Determine the correct processor for the file and execute its processing logic.
         The processor itself handles updating status and error messages.
+        A cancelled file gets no result file.
         """
         try:
             _, ext = os.path.splitext(self.text_file.original_file.name)
             processor_cls = FileProcessorFactory.get_processor(ext)
-            processor = processor_cls(self.text_file)
+            processor = processor_cls(self.text_file, limits=ProcessingLimits.from_settings())
 
             result_path = processor.process()
-            self.text_file.result_file.name = result_path
+            if result_path:
+                self.text_file.result_file.name = result_path
 
         except Exception as e:
             logger.exception(f"Processing failed for file {self.text_file.id}: {e}")
 
 
         finally:
-            self.text_file.save(update_fields=['result_file'])
\ No newline at end of file
+            with tracer.span('finalize', file_id=self.text_file.id):
+                self.text_file.save(update_fields=['result_file'])
\ No newline at end of file
@@ -0,0 +1,260 @@
+import fcntl
+import logging
+import os
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+
+from text_processor.exceptions import UploadSessionClosed
+from text_processor.models.models import TextFile, UploadSession
+from text_processor.services.scheduling_services import FairScheduler
+from text_processor.tracing import tracer
+from text_processor.utils.upload_utils import add_range, received_bytes
+
+logger = logging.getLogger(__name__)
+
+
+class ChunkedUploadService:
+    """
+    Resumable, chunked uploads of large files.
+
+    A client creates an `UploadSession` announcing the file name and size, then
+    sends the file as numbered chunks of `chunk_size` bytes (chunk N starts at
+    offset N * chunk_size), in any order and possibly in parallel. Each chunk is
+    written straight into a sparse staging file in the media storage, so a
+    request only lives as long as one chunk transfer. After a dropped connection
+    the client asks which ranges were received and resends only the missing
+    chunks. Finalizing moves the staging file into `uploads/`, creates the
+    `TextFile` and hands it to the `FairScheduler`, exactly like a regular upload.
+
+    Chunks are written while holding a shared `flock` on the staging file, and
+    finalizing takes an exclusive one before it moves the file, so a chunk is
+    either written completely before the file is moved or rejected with
+    `UploadSessionClosed` (409) without touching it. Finalizing and aborting also
+    hold the session's row lock, under which every chunk records its range, so a
+    chunk racing an abort is rejected as well. Sessions that
+    receive nothing for `UPLOAD_SESSION_EXPIRY` seconds are aborted by
+    `cleanup_expired()`, which frees their staging files.
+
+    Args:
+        session (UploadSession): The upload session to work on.
+    """
+
+    #: Number of bytes copied from the request body to the staging file at a time.
+    copy_buffer_size = 1024 * 1024
+
+    def __init__(self, session):
+        self.session = session
+
+    @property
+    def staging_name(self):
+        """Storage name of the staging file the chunks are written into."""
+        return f'uploads/partial/{self.session.id}.part'
+
+    def start(self):
+        """Create the empty staging file for a new session (sparse, at its final size)."""
+        path = default_storage.path(self.staging_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.truncate(self.session.total_size)
+
+    def write_chunk(self, number, stream, content_length, content_range=None):
+        """
+        Write chunk `number` from `stream` into the staging file.
+
+        Args:
+            number (int): Chunk number (0-based).
+            stream: Readable binary stream with the chunk content (the request body).
+            content_length (int | None): Length of the body announced by the client.
+            content_range (str, optional): Value of the `Content-Range` header. If given,
+                it must match the chunk's offsets (`bytes <first>-<last>/<total size>`).
+
+        Raises:
+            ValidationError: If the chunk number, length or range is invalid.
+            ParseError: If the body ended before the whole chunk was received.
+            UploadSessionClosed: If the session was finalized or aborted meanwhile.
+
+        Returns:
+            list[list[int]]: All byte ranges received so far.
+        """
+        session = self.session
+        start = number * session.chunk_size
+        if start >= session.total_size:
+            raise serializers.ValidationError(
+                f"Chunk {number} starts after the end of the file ({session.total_size} bytes)."
+            )
+        length = min(session.chunk_size, session.total_size - start)
+        if content_length != length:
+            raise serializers.ValidationError(f"Chunk {number} must be exactly {length} bytes long.")
+        expected_range = f"bytes {start}-{start + length - 1}/{session.total_size}"
+        if content_range and content_range.strip() != expected_range:
+            raise serializers.ValidationError(
+                f"Content-Range of chunk {number} must be '{expected_range}'."
+            )
+
+        written = 0
+        # The shared lock keeps a concurrent finalize from moving the file until the range is recorded.
+        with self._staging_file(fcntl.LOCK_SH) as f:
+            f.seek(start)
+            while written < length:
+                data = stream.read(min(self.copy_buffer_size, length - written))
+                if not data:
+                    break
+                f.write(data)
+                written += len(data)
+            if written != length:
+                raise ParseError(f"Chunk {number} was cut off after {written} of {length} bytes, please resend it.")
+
+            # Chunks may arrive in parallel: merge the new range under a row lock.
+            with transaction.atomic():
+                locked = self._lock()
+                if locked.text_file_id:
+                    raise UploadSessionClosed()
+                locked.received = add_range(locked.received, start, start + length)
+                locked.save(update_fields=['received', 'updated_at'])
+        session.received = locked.received
+        return session.received
+
+    def is_complete(self):
+        return received_bytes(self.session.received) == self.session.total_size
+
+    def finalize(self):
+        """
+        Turn the fully received staging file into a `TextFile` and queue it.
+
+        Finalizing a session twice returns the file created the first time.
+        Chunks still being written are waited for before the file is moved.
+
+        Raises:
+            ValidationError: If chunks are still missing.
+            Throttled: If the processing queue is over its limits (the session
+                stays open and can be finalized later).
+            UploadSessionClosed: If the session was aborted meanwhile.
+
+        Returns:
+            tuple[TextFile, bool]: The file, and whether it was created by this call.
+        """
+        session = self.session
+        if session.text_file_id:
+            return session.text_file, False
+        if not self.is_complete():
+            raise serializers.ValidationError(
+                f"The upload is incomplete: {received_bytes(session.received)} of "
+                f"{session.total_size} bytes received."
+            )
+
+        scheduler = FairScheduler()
+        with tracer.span('upload.admission'):
+            scheduler.check_admission(session.user, session.total_size)
+
+        with tracer.span('upload.write') as span:
+            try:
+                # Taken before the row lock, which chunk writers acquire while holding their shared lock.
+                with self._staging_file(fcntl.LOCK_EX), transaction.atomic():
+                    locked = self._lock()
+                    if locked.text_file_id:
+                        return locked.text_file, False
+
+                    name = default_storage.get_available_name(f'uploads/{os.path.basename(session.filename)}')
+                    os.replace(default_storage.path(self.staging_name), default_storage.path(name))
+                    text_file = TextFile.objects.create(
+                        user=session.user,
+                        original_file=name,
+                        file_size=session.total_size,
+                        pipeline=session.pipeline,
+                        trace_id=tracer.get_trace_id(),
+                    )
+                    locked.text_file = text_file
+                    locked.save(update_fields=['text_file', 'updated_at'])
+            except UploadSessionClosed:
+                # The staging file is gone: finalized by a concurrent request, or aborted.
+                finalized = UploadSession.objects.filter(pk=session.pk, text_file__isnull=False).first()
+                if finalized is None:
+                    raise
+                return finalized.text_file, False
+            if span:
+                span.attributes['file_id'] = text_file.id
+        session.text_file = text_file
+
+        logger.info(f"Upload session {session.id} finalized as TextFile ID={text_file.id}.")
+        scheduler.dispatch()
+        return text_file, True
+
+    def abort(self):
+        """Delete the session, and the staging file of an unfinished session."""
+        with transaction.atomic():
+            try:
+                locked = self._lock()
+            except UploadSessionClosed:
+                return
+            if not locked.text_file_id:
+                default_storage.delete(self.staging_name)
+            locked.delete()
+
+    @classmethod
+    def cleanup_expired(cls):
+        """
+        Abort unfinished sessions that received nothing for `UPLOAD_SESSION_EXPIRY` seconds.
+
+        Their staging files are allocated at the full file size, so abandoned
+        sessions would otherwise hold up to `UPLOAD_MAX_SIZE` of disk each forever.
+
+        Returns:
+            int: Number of aborted sessions.
+        """
+        expiry = settings.UPLOAD_SESSION_EXPIRY
+        if not expiry:
+            return 0
+        expired = UploadSession.objects.filter(
+            text_file__isnull=True, updated_at__lt=timezone.now() - timedelta(seconds=expiry),
+        )
+        aborted = 0
+        for session in expired.iterator():
+            cls(session).abort()
+            aborted += 1
+        if aborted:
+            logger.info(f"Aborted {aborted} expired upload sessions.")
+        return aborted
+
+    @contextmanager
+    def _staging_file(self, operation):
+        """
+        Open the staging file and hold an `flock` on it.
+
+        Args:
+            operation (int): `fcntl.LOCK_SH` to write chunks, `fcntl.LOCK_EX` to move the file.
+
+        Yields:
+            The staging file, opened for reading and writing.
+
+        Raises:
+            UploadSessionClosed: If the file was moved by a finalize or deleted by an
+                abort, also while waiting for the lock.
+        """
+        path = default_storage.path(self.staging_name)
+        try:
+            f = open(path, 'r+b')
+        except FileNotFoundError:
+            raise UploadSessionClosed()
+        with f:
+            fcntl.flock(f, operation)
+            try:
+                moved = os.stat(path).st_ino != os.fstat(f.fileno()).st_ino
+            except FileNotFoundError:
+                moved = True
+            if moved:
+                raise UploadSessionClosed()
+            yield f
+
+    def _lock(self):
+        """Returns the session row locked for update, or raises `UploadSessionClosed` if it was deleted."""
+        try:
+            return UploadSession.objects.select_for_update().get(pk=self.session.pk)
+        except UploadSession.DoesNotExist:
+            raise UploadSessionClosed()
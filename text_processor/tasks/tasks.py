@@ -1,9 +1,14 @@
 from celery import shared_task
 import logging
+import time
 from django.db import DatabaseError
-from text_processor.models.models import TextFile
+from text_processor.models.models import ProcessingBatch, TextFile
+from text_processor.services.batch_services import BatchDispatcher
+from text_processor.services.scheduling_services import FairScheduler
 from text_processor.services.text_processor_services import TextProcessingService
+from text_processor.services.upload_services import ChunkedUploadService
 from text_processor.models.file_status_choices import FileStatus
+from text_processor.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
@@ -24,7 +29,25 @@ def process_file_task(self, file_id: int):
     based on file extension.
 
     The task retries automatically for transient I/O and database errors.
+    Files cancelled before the task starts are skipped. When the task ends,
+    the `FairScheduler` dispatches the next waiting jobs into the freed slot.
+
+    The job's trace continues from the `trace_id` task header, and the time the
+    message spent in the broker (from the `enqueued_at` header) is recorded as
+    a `queue.wait` span.
     """
+    started_at = time.time()
+    headers = self.request.headers or {}
+    with tracer.trace(headers.get('trace_id')):
+        enqueued_at = headers.get('enqueued_at')
+        if enqueued_at:
+            tracer.record_span('queue.wait', start=enqueued_at, end=started_at,
+                               file_id=file_id, retries=self.request.retries)
+        _process_file(self, file_id)
+
+
+def _process_file(task, file_id):
+    """Body of `process_file_task`, run inside the job's trace."""
 
     try:
         text_file = TextFile.objects.get(id=file_id)
@@ -32,22 +55,26 @@ def process_file_task(self, file_id: int):
         logger.warning(f"TextFile with ID={file_id} does not exist — skipping task.")
         return
 
+    if text_file.status == FileStatus.CANCELLED:
+        logger.info(f"TextFile ID={file_id} was cancelled — skipping task.")
+        return
+
     logger.info(f"Starting asynchronous processing for TextFile ID={file_id} ({text_file.original_file.name}).")
 
     service = TextProcessingService(text_file)
 
     try:
         service.process()
-        logger.info(f"File ID={file_id} processed successfully (status: DONE).")
+        logger.info(f"File ID={file_id} finished processing (status: {text_file.status}).")
 
     except (IOError, OSError) as e:
         logger.warning(f"I/O or OS error for file ID={file_id}: {e}")
-        raise self.retry(exc=e)
+        raise task.retry(exc=e)
 
     except DatabaseError as e:
 
         logger.warning(f"Database error while processing file ID={file_id}: {e}")
-        raise self.retry(exc=e)
+        raise task.retry(exc=e)
 
     except Exception as e:
 
@@ -56,3 +83,58 @@ def process_file_task(self, file_id: int):
         text_file.error_message = str(e)[:500]
         text_file.save(update_fields=['status', 'error_message'])
         logger.error(f"File ID={file_id} marked as FAILED due to unexpected error.")
+
+    finally:
+        FairScheduler().dispatch()
+
+
+@shared_task(ignore_result=True)
+def dispatch_pending_task():
+    """
+    Periodic Celery beat task that keeps the processing queue moving.
+
+    Fails jobs left `processing` by lost workers, then dispatches waiting jobs,
+    so jobs whose publish failed or whose owner was blocked by a lost job are
+    not stuck until the next upload or finished task.
+    """
+    scheduler = FairScheduler()
+    scheduler.recover_stale()
+    scheduler.dispatch()
+
+
+@shared_task(ignore_result=True)
+def dispatch_batch_task(batch_id: int):
+    """
+    Celery task that sends the next chunk of a processing batch to the workers.
+
+    Dispatches up to `BATCH_DISPATCH_CHUNK_SIZE` files of the batch as one Celery
+    group and re-schedules itself after `BATCH_DISPATCH_INTERVAL` seconds while
+    files of the batch are still waiting (see `BatchDispatcher`).
+    """
+    try:
+        batch = ProcessingBatch.objects.get(id=batch_id)
+    except ProcessingBatch.DoesNotExist:
+        logger.warning(f"ProcessingBatch with ID={batch_id} does not exist — skipping task.")
+        return
+
+    BatchDispatcher().run(batch)
+
+
+@shared_task(ignore_result=True)
+def sweep_batches_task():
+    """
+    Periodic Celery beat task that restarts processing batches whose dispatch stopped.
+
+    See `BatchDispatcher.sweep()`.
+    """
+    BatchDispatcher().sweep()
+
+
+@shared_task(ignore_result=True)
+def cleanup_upload_sessions_task():
+    """
+    Periodic Celery beat task that aborts expired upload sessions and frees their staging files.
+
+    See `ChunkedUploadService.cleanup_expired()`.
+    """
+    ChunkedUploadService.cleanup_expired()
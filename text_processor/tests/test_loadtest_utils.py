@@ -0,0 +1,41 @@
+import random
+
+import pytest
+
+from text_processor.utils.loadtest_utils import generate_text, parse_size, parse_size_mix, percentile, summarize
+
+
+def test_parse_size_units():
+    assert parse_size("512") == 512
+    assert parse_size("64KB") == 64 * 1024
+    assert parse_size("1.5mb") == int(1.5 * 1024 ** 2)
+    assert parse_size("2G") == 2 * 1024 ** 3
+
+
+def test_parse_size_invalid():
+    with pytest.raises(ValueError):
+        parse_size("lots")
+
+
+def test_parse_size_mix():
+    assert parse_size_mix("1KB:70, 100KB:25,5MB") == [(1024, 70), (100 * 1024, 25), (5 * 1024 ** 2, 1)]
+    with pytest.raises(ValueError):
+        parse_size_mix("1KB:0")
+
+
+def test_generate_text_exact_size():
+    content = generate_text(1000, random.Random(0))
+    assert len(content) == 1000
+    assert b"\n" in content
+
+
+def test_percentile_and_summarize():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == pytest.approx(50.5)
+    assert percentile([], 50) is None
+
+    stats = summarize(values)
+    assert stats["count"] == 100
+    assert stats["min"] == 1.0
+    assert stats["max"] == 100.0
+    assert summarize([])["p99"] is None
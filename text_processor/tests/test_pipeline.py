@@ -0,0 +1,84 @@
+import io
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from text_processor.processors.csv_processor import CSVFileProcessor
+from text_processor.processors.txt_processor import TxtFileProcessor
+from text_processor.utils.pipeline_utils import (
+    compile_pipeline, mask_emails, mask_emails_and_numbers, mask_numbers, shuffle_letters,
+)
+from text_processor.utils.text_utils import shuffle_text_line
+
+
+@pytest.fixture
+def reverse_shuffle(monkeypatch):
+    monkeypatch.setattr(random, "shuffle", lambda x: x.reverse())
+
+
+def test_single_stage_compiles_to_stage_function():
+    assert compile_pipeline(["shuffle"]) is shuffle_text_line
+
+
+def test_unknown_or_empty_pipeline():
+    with pytest.raises(ValueError, match="Unknown pipeline stage"):
+        compile_pipeline(["shuffle", "uppercase"])
+    with pytest.raises(ValueError):
+        compile_pipeline([])
+
+
+@pytest.mark.parametrize("text", [
+    "Call 555 1234 or write to john.doe99@example.co.uk",
+    "3,14@y.com pi=3.14 x2@a.org 12abc",
+])
+def test_fused_masks_match_separate_stages(text):
+    assert mask_emails_and_numbers(text) == mask_numbers(mask_emails(text))
+
+
+def test_masks():
+    assert mask_emails("Mail me@x.com now") == "Mail [email] now"
+    assert mask_numbers("Pi is 3.14, not 3") == "Pi is [number], not [number]"
+
+
+def test_shuffle_letters_keeps_punctuation(reverse_shuffle):
+    assert shuffle_letters("Hello, world!  (Python)") == "Hlleo, wlrod!  (Pohtyn)"
+
+
+def test_pipeline_applies_stages_in_order(reverse_shuffle):
+    transform = compile_pipeline(["lowercase", "shuffle_letters", "mask_emails", "mask_numbers"])
+    assert transform("Hello, ME@x.com has 2 Pythons.") == "hlleo, [email] has [number] pnohtys."
+
+
+@pytest.mark.parametrize("stages", [
+    ["shuffle", "mask_emails", "mask_numbers"],
+    ["mask_emails", "mask_numbers", "shuffle"],
+    ["shuffle", "mask_emails", "lowercase", "mask_numbers"],
+])
+@pytest.mark.parametrize("text, expected", [
+    ("mail ann@site.io please 42", "[email]"),
+    ("a.b@c.de, 3.14", "[email], [number]"),
+])
+def test_shuffle_never_leaks_masked_values(stages, text, expected):
+    transform = compile_pipeline(stages)
+    for _ in range(200):
+        result = transform(text)
+        assert expected in result
+        assert "@" not in result and not any(c.isdigit() for c in result)
+
+
+def test_masks_run_before_shuffle_stages(reverse_shuffle):
+    transform = compile_pipeline(["shuffle", "mask_emails"])
+    assert transform("Write ann@site.io today") == "Wtire [email] tadoy"
+
+
+def test_processors_apply_file_pipeline(reverse_shuffle):
+    text_file = SimpleNamespace(id=1, pipeline=["lowercase", "mask_numbers"])
+
+    outfile = io.StringIO()
+    TxtFileProcessor(text_file)._process_stream(io.StringIO("Room 101\nOK\n"), outfile)
+    assert outfile.getvalue() == "room [number]\nok\n"
+
+    outfile = io.StringIO()
+    CSVFileProcessor(text_file)._process_stream(io.StringIO("Id,Name\r\n7,Ann\r\n"), outfile)
+    assert outfile.getvalue() == "id,name\r\n[number],ann\r\n"
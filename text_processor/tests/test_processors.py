@@ -0,0 +1,91 @@
+import io
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from text_processor.exceptions import ProcessingCancelled, ResourceLimitExceeded
+from text_processor.processors.txt_processor import TxtFileProcessor
+from text_processor.utils.resource_utils import ProcessingLimits, ResourceBudget
+
+
+def test_txt_processor_stream(monkeypatch):
+    monkeypatch.setattr(random, "shuffle", lambda x: x.reverse())
+    processor = TxtFileProcessor(SimpleNamespace(id=1))
+    outfile = io.StringIO()
+    processor._process_stream(io.StringIO("Python Django\nTest\n"), outfile)
+    assert outfile.getvalue() == "Pohtyn Dgnajo\nTset\n"
+
+
+def test_processor_stops_when_cancelled(monkeypatch):
+    processor = TxtFileProcessor(SimpleNamespace(id=1))
+    processor.checkpoint_interval = 10
+    processor.cancel_check_interval = 0
+    monkeypatch.setattr(processor, "_is_cancelled", lambda: True)
+
+    outfile = io.StringIO()
+    with pytest.raises(ProcessingCancelled):
+        processor._process_stream(io.StringIO("line\n" * 100), outfile)
+    assert outfile.getvalue().count("\n") < 10
+
+
+def test_cancellation_check_is_throttled(monkeypatch):
+    processor = TxtFileProcessor(SimpleNamespace(id=1))
+    processor.checkpoint_interval = 1
+    processor.cancel_check_interval = 3600
+    checks = []
+    monkeypatch.setattr(processor, "_is_cancelled", lambda: checks.append(1) or False)
+
+    list(processor._checkpoints(range(1000)))
+    assert checks == []
+
+
+def test_unsaved_file_is_never_cancelled():
+    assert TxtFileProcessor(SimpleNamespace(id=None))._is_cancelled() is False
+
+
+def test_txt_processor_long_line_in_chunks(monkeypatch):
+    monkeypatch.setattr(random, "shuffle", lambda x: x.reverse())
+    processor = TxtFileProcessor(SimpleNamespace(id=1), limits=ProcessingLimits(line_chunk_size=16))
+    outfile = io.StringIO()
+    processor._process_stream(io.StringIO(" ".join(["Python Django"] * 20) + "\n"), outfile)
+    assert outfile.getvalue() == " ".join(["Pohtyn Dgnajo"] * 20) + "\n"
+
+
+def test_processor_stops_over_wall_time(monkeypatch):
+    processor = TxtFileProcessor(SimpleNamespace(id=1), limits=ProcessingLimits(max_wall_time=1))
+    processor.checkpoint_interval = 1
+    processor.budget.started_at -= 10
+
+    with pytest.raises(ResourceLimitExceeded, match="1 seconds"):
+        processor._process_stream(io.StringIO("line\n" * 10), io.StringIO())
+
+
+def test_budget_memory_growth(monkeypatch):
+    rss = iter([100, 150, 10_000])
+    monkeypatch.setattr("text_processor.utils.resource_utils.current_rss", lambda: next(rss))
+    budget = ResourceBudget(ProcessingLimits(max_rss_growth=1000))
+    budget.check()
+    assert budget.peak_rss == 150
+    with pytest.raises(ResourceLimitExceeded):
+        budget.check()
+    assert budget.peak_rss == 10_000
+
+
+def test_process_local_writes_result_atomically(monkeypatch, tmp_path):
+    monkeypatch.setattr(random, "shuffle", lambda x: x.reverse())
+    source, result = tmp_path / "in.txt", tmp_path / "out.txt"
+    source.write_text("Python Django\n", encoding="utf-8")
+
+    TxtFileProcessor(SimpleNamespace(id=None)).process_local(str(source), str(result))
+    assert result.read_text(encoding="utf-8") == "Pohtyn Dgnajo\n"
+    assert not (tmp_path / "out.txt.part").exists()
+
+
+def test_process_local_removes_partial_output_on_error(tmp_path):
+    source, result = tmp_path / "in.txt", tmp_path / "out.txt"
+    source.write_bytes(b"\xff\xfe not utf-8\n")
+
+    with pytest.raises(UnicodeDecodeError):
+        TxtFileProcessor(SimpleNamespace(id=None)).process_local(str(source), str(result))
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["in.txt"]
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from text_processor.tracing import tracer
+from text_processor.tracing.exporters import BaseSpanExporter, JsonLinesSpanExporter
+
+
+class ListExporter(BaseSpanExporter):
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    exporter = ListExporter()
+    monkeypatch.setattr(tracer, "_exporter", exporter)
+    return exporter
+
+
+def test_span_outside_trace_is_noop(exporter):
+    with tracer.span("transform") as span:
+        assert span is None
+    assert exporter.spans == []
+    assert tracer.get_trace_id() is None
+
+
+def test_spans_are_nested_within_trace(exporter):
+    with tracer.trace() as trace_id:
+        with tracer.span("upload") as outer:
+            with tracer.span("upload.write", file_id=1):
+                pass
+            with tracer.trace(trace_id):
+                with tracer.span("enqueue"):
+                    pass
+    assert tracer.get_trace_id() is None
+
+    write, enqueue, upload = exporter.spans
+    assert {s.trace_id for s in exporter.spans} == {trace_id}
+    assert upload is outer and upload.parent_id is None
+    assert write.parent_id == upload.span_id
+    assert write.attributes == {"file_id": 1}
+    assert enqueue.parent_id == upload.span_id
+    assert upload.duration >= write.duration >= 0
+
+
+def test_span_records_error(exporter):
+    with pytest.raises(ValueError):
+        with tracer.trace("abc"), tracer.span("transform"):
+            raise ValueError("boom")
+    assert exporter.spans[0].attributes["error"] == "ValueError: boom"
+
+
+def test_record_span(exporter):
+    with tracer.trace("abc"):
+        tracer.record_span("queue.wait", start=100.0, end=102.5, file_id=1)
+    assert exporter.spans[0].trace_id == "abc"
+    assert exporter.spans[0].duration == 2.5
+
+
+def test_json_lines_exporter(tmp_path, monkeypatch):
+    path = tmp_path / "traces" / "spans.jsonl"
+    monkeypatch.setattr(tracer, "_exporter", JsonLinesSpanExporter(path))
+
+    with tracer.trace("abc"):
+        with tracer.span("upload"):
+            pass
+        tracer.record_span("queue.wait", start=1.0, end=2.0)
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["upload", "queue.wait"]
+    assert all(line["trace_id"] == "abc" for line in lines)
@@ -0,0 +1,18 @@
+from text_processor.utils.upload_utils import add_range, missing_chunks, received_bytes
+
+
+def test_add_range_merges_overlapping_and_adjacent_ranges():
+    ranges = add_range([], 10, 20)
+    ranges = add_range(ranges, 30, 40)
+    assert ranges == [[10, 20], [30, 40]]
+    assert add_range(ranges, 20, 30) == [[10, 40]]
+    assert add_range(ranges, 15, 35) == [[10, 40]]
+    assert add_range(ranges, 10, 20) == ranges
+
+
+def test_received_bytes_and_missing_chunks():
+    ranges = [[0, 10], [20, 25]]
+    assert received_bytes(ranges) == 15
+    assert missing_chunks(ranges, total_size=25, chunk_size=10) == [1]
+    assert missing_chunks([], total_size=25, chunk_size=10) == [0, 1, 2]
+    assert missing_chunks([[0, 25]], total_size=25, chunk_size=10) == []
@@ -1,6 +1,9 @@
 import random
 import io
+import pytest
+from text_processor.exceptions import ResourceLimitExceeded
 from text_processor.utils.text_utils import shuffle_inner_letters, shuffle_text_line, line_generator
+from text_processor.utils.text_utils import line_chunk_generator, bounded_line_reader
 
 
 def test_shuffle_inner_letters_short_words():
@@ -36,6 +39,29 @@ def test_shuffle_text_line(monkeypatch):
         assert orig[-1] == new[-1]
 
 
+def test_shuffle_text_line_preserves_whitespace(monkeypatch):
+    monkeypatch.setattr(random, "shuffle", lambda x: x.reverse())
+    assert shuffle_text_line("  id\tPython   Django \r") == "  id\tPohtyn   Dgnajo \r"
+
+
+def test_shuffle_text_line_fast_path_matches_pattern_path():
+    line = "  Hello   wonderful  world  "
+    random.seed(7)
+    fast = shuffle_text_line(line)
+    random.seed(7)
+    # A tab sends the same words through the pattern path.
+    slow = shuffle_text_line(line + "\t")
+    assert fast + "\t" == slow
+    assert [len(word) for word in fast.split(" ")] == [len(word) for word in line.split(" ")]
+
+
+def test_shuffle_text_line_punctuation_aware(monkeypatch):
+    monkeypatch.setattr(random, "shuffle", lambda x: x.reverse())
+    assert shuffle_text_line('"hello," (Python)') == '",olleh" (nohtyP)'
+    assert shuffle_text_line('"hello," (Python)', punctuation_aware=True) == '"hlleo," (Pohtyn)'
+    assert shuffle_text_line("v1.2.3 item_1234", punctuation_aware=True) == "v1.2.3 ietm_1234"
+
+
 def test_line_generator(monkeypatch):
     monkeypatch.setattr(random, "shuffle", lambda x: x.reverse())
     input_data = io.StringIO("Hello\nWorld\n")
@@ -43,3 +69,35 @@ def test_line_generator(monkeypatch):
     assert len(output) == 2
     assert output[0].endswith("\n")
     assert output[1].endswith("\n")
+
+
+def test_line_chunk_generator_short_lines():
+    output = list(line_chunk_generator(io.StringIO("Hello\nWorld"), chunk_size=100))
+    assert output == [("Hello", "\n"), ("World", "\n")]
+
+
+def test_line_chunk_generator_splits_long_line_at_whitespace():
+    line = "alpha beta gamma delta"
+    output = list(line_chunk_generator(io.StringIO(line + "\nend\n"), chunk_size=8))
+    assert "".join(text + sep for text, sep in output) == line + "\nend\n"
+    assert all(" " not in text or len(text) <= 16 for text, _ in output)
+    # No word is split between chunks.
+    assert [t for text, _ in output for t in text.split()] == ["alpha", "beta", "gamma", "delta", "end"]
+
+
+@pytest.mark.parametrize("last_line", ["x" * 8, "xxxxxxx ", "aaaa bbbb cccc d"])
+def test_line_chunk_generator_terminates_last_line_at_chunk_boundary(last_line):
+    output = list(line_chunk_generator(io.StringIO("first\n" + last_line), chunk_size=8))
+    assert "".join(text + sep for text, sep in output) == "first\n" + last_line + "\n"
+    assert output[-1][1] == "\n"
+
+
+def test_line_chunk_generator_line_limit():
+    with pytest.raises(ResourceLimitExceeded):
+        list(line_chunk_generator(io.StringIO("short\n" + "x" * 50 + "\n"), chunk_size=8, max_line_length=20))
+
+
+def test_bounded_line_reader():
+    assert list(bounded_line_reader(io.StringIO("a,b\r\nc,d\r\n"), 3)) == ["a,b\r\n", "c,d\r\n"]
+    with pytest.raises(ResourceLimitExceeded):
+        list(bounded_line_reader(io.StringIO("a,b\nccc,ddd\n"), 3))
@@ -0,0 +1,171 @@
+import json
+import random
+import threading
+import zipfile
+from types import SimpleNamespace
+
+import pytest
+
+from text_processor.exceptions import BudgetExceeded, ProcessingCancelled
+from text_processor.processors.file_processor_factory import FileProcessorFactory
+from text_processor.processors.txt_processor import TxtFileProcessor
+from text_processor.processors.zip_processor import ZipFileProcessor
+from text_processor.tracing import tracer
+from text_processor.utils.resource_utils import ProcessingLimits, ResourceBudget
+
+
+def _make_processor(limits=None):
+    processor = ZipFileProcessor(SimpleNamespace(id=1, error_message=None), limits=limits)
+    processor.max_workers = 2
+    processor.spool_max_size = 1024
+    return processor
+
+
+def _write_archive(path, members):
+    with zipfile.ZipFile(path, "w") as zf:
+        for name, content in members.items():
+            zf.writestr(name, content)
+
+
+def test_zip_processor_is_registered():
+    assert FileProcessorFactory.get_processor(".zip") is ZipFileProcessor
+
+
+def test_zip_processor_processes_members(tmp_path, monkeypatch):
+    monkeypatch.setattr(random, "shuffle", lambda x: x.reverse())
+    input_path = tmp_path / "in.zip"
+    output_path = tmp_path / "out.zip"
+    members = {f"docs/file_{i}.txt": "Python Django\n" * (i + 1) for i in range(10)}
+    members["table.csv"] = "Python,Django\r\n"
+    _write_archive(input_path, members)
+
+    processor = _make_processor()
+    processor._process_file(str(input_path), str(output_path))
+
+    with zipfile.ZipFile(output_path) as zf:
+        assert zf.namelist() == list(members)
+        assert zf.read("docs/file_0.txt").decode() == "Pohtyn Dgnajo\n"
+        assert zf.read("docs/file_9.txt").decode() == "Pohtyn Dgnajo\n" * 10
+        assert zf.read("table.csv").decode() == "Pohtyn,Dgnajo\r\n"
+    assert processor.text_file.error_message is None
+
+
+def test_zip_processor_reports_member_failures(tmp_path):
+    input_path = tmp_path / "in.zip"
+    output_path = tmp_path / "out.zip"
+    _write_archive(input_path, {
+        "ok.txt": "Hello world\n",
+        "image.jpg": b"\xff\xd8\xff\xe0",
+        "nested.zip": b"PK",
+        "broken.txt": b"\xff\xfe\xfa",
+    })
+
+    processor = _make_processor()
+    processor._process_file(str(input_path), str(output_path))
+
+    with zipfile.ZipFile(output_path) as zf:
+        assert zf.namelist() == ["ok.txt", ZipFileProcessor.errors_member_name]
+        errors = json.loads(zf.read(ZipFileProcessor.errors_member_name))
+    assert set(errors) == {"image.jpg", "nested.zip", "broken.txt"}
+    assert "3 of 4 archive members failed" in processor.text_file.error_message
+
+
+def test_zip_processor_errors_member_does_not_collide(tmp_path, monkeypatch):
+    monkeypatch.setattr(random, "shuffle", lambda x: x.reverse())
+    input_path = tmp_path / "in.zip"
+    output_path = tmp_path / "out.zip"
+    _write_archive(input_path, {
+        "_errors.txt": "Hello world\n",
+        "_errors_1.txt": "Hello world\n",
+        "image.jpg": b"\xff\xd8",
+    })
+
+    processor = _make_processor()
+    processor.errors_member_name = "_errors.txt"
+    processor._process_file(str(input_path), str(output_path))
+
+    with zipfile.ZipFile(output_path) as zf:
+        assert zf.namelist() == ["_errors.txt", "_errors_1.txt", "_errors_2.txt"]
+        assert zf.read("_errors.txt").decode() == "Hlleo wlrod\n"
+        assert set(json.loads(zf.read("_errors_2.txt"))) == {"image.jpg"}
+    assert "'_errors_2.txt'" in processor.text_file.error_message
+
+
+def test_zip_member_spans_belong_to_trace(tmp_path, monkeypatch):
+    spans = []
+    monkeypatch.setattr(tracer, "_exporter", SimpleNamespace(export=spans.append))
+    input_path = tmp_path / "in.zip"
+    _write_archive(input_path, {f"file_{i}.txt": "Hello world\n" for i in range(4)})
+
+    with tracer.trace("abc"), tracer.span("transform") as parent:
+        _make_processor()._process_file(str(input_path), str(tmp_path / "out.zip"))
+
+    members = [span for span in spans if span.name == "zip.member"]
+    assert len(members) == 4
+    assert {(span.trace_id, span.parent_id) for span in members} == {("abc", parent.span_id)}
+
+
+def test_zip_members_share_cancellation_throttle(tmp_path, monkeypatch):
+    monkeypatch.setattr(TxtFileProcessor, "checkpoint_interval", 1)
+    input_path = tmp_path / "in.zip"
+    _write_archive(input_path, {"short.txt": "Hello world\n" * 5})
+
+    processor = _make_processor()
+    processor.cancel_check_interval = 0
+    checks = []
+    monkeypatch.setattr(processor, "_is_cancelled", lambda: checks.append(1) or False)
+    processor._process_file(str(input_path), str(tmp_path / "out.zip"))
+
+    # One check before the member is submitted, one per line of the member.
+    assert len(checks) == 6
+
+
+def test_zip_processor_stops_when_cancelled_in_member(tmp_path, monkeypatch):
+    monkeypatch.setattr(TxtFileProcessor, "checkpoint_interval", 1)
+    input_path = tmp_path / "in.zip"
+    _write_archive(input_path, {"short.txt": "Hello world\n" * 5})
+
+    processor = _make_processor()
+    processor.cancel_check_interval = 0
+    checks = []
+    monkeypatch.setattr(processor, "_is_cancelled", lambda: len(checks) > 1 or checks.append(1))
+
+    with pytest.raises(ProcessingCancelled):
+        processor._process_file(str(input_path), str(tmp_path / "out.zip"))
+
+
+def test_zip_processor_fails_when_member_exceeds_job_budget(tmp_path, monkeypatch):
+    monkeypatch.setattr(TxtFileProcessor, "checkpoint_interval", 1)
+    input_path = tmp_path / "in.zip"
+    output_path = tmp_path / "out.zip"
+    _write_archive(input_path, {"a.txt": "Hello world\n" * 5, "b.txt": "Hello world\n" * 5})
+
+    processor = _make_processor()
+    processor.budget = ResourceBudget(ProcessingLimits(max_wall_time=1))
+    check = processor.budget.check
+
+    def check_in_member():
+        if threading.current_thread().name.startswith("zip-member"):
+            processor.budget.started_at = 0  # only the members run over time
+        check()
+
+    monkeypatch.setattr(processor.budget, "check", check_in_member)
+
+    with pytest.raises(BudgetExceeded, match="1 seconds"):
+        processor.process_local(str(input_path), str(output_path))
+    assert not output_path.exists()
+    assert processor.text_file.error_message is None
+
+
+def test_zip_processor_reports_long_line_as_member_failure(tmp_path):
+    input_path = tmp_path / "in.zip"
+    output_path = tmp_path / "out.zip"
+    _write_archive(input_path, {"ok.txt": "Hello\n", "long.txt": "x" * 100 + "\n"})
+
+    processor = _make_processor(ProcessingLimits(max_line_length=10, line_chunk_size=8))
+    processor._process_file(str(input_path), str(output_path))
+
+    with zipfile.ZipFile(output_path) as zf:
+        assert zf.namelist() == ["ok.txt", ZipFileProcessor.errors_member_name]
+        assert set(json.loads(zf.read(ZipFileProcessor.errors_member_name))) == {"long.txt"}
+    assert "1 of 2 archive members failed" in processor.text_file.error_message
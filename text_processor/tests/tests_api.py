@@ -1,8 +1,12 @@
+from unittest import mock
+from django.contrib.auth.models import User
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.core.files.uploadedfile import SimpleUploadedFile
 from text_processor.models.models import TextFile
+from text_processor.tasks.tasks import process_file_task
 
 class TextFileUploadAPITest(APITestCase):
     def test_upload_text_file(self):
@@ -20,6 +24,33 @@ class TextFileUploadAPITest(APITestCase):
         text_file = TextFile.objects.first()
         self.assertTrue(text_file.original_file.name.endswith('.txt'))
         self.assertEqual(text_file.status, 'pending')
+        self.assertEqual(response['X-Trace-Id'], text_file.trace_id)
+
+    def test_upload_with_pipeline(self):
+        test_file = SimpleUploadedFile("test.txt", b"Hello 42", content_type="text/plain")
+
+        url = reverse('file-upload')
+        response = self.client.post(url, {'original_file': test_file, 'pipeline': ['lowercase', 'shuffle']},
+                                    format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(TextFile.objects.get().pipeline, ['lowercase', 'shuffle'])
+
+    def test_upload_defaults_to_shuffle_pipeline(self):
+        test_file = SimpleUploadedFile("test.txt", b"Hello", content_type="text/plain")
+
+        response = self.client.post(reverse('file-upload'), {'original_file': test_file}, format='multipart')
+
+        self.assertEqual(response.data['pipeline'], ['shuffle'])
+
+    def test_upload_rejects_unknown_pipeline_stage(self):
+        test_file = SimpleUploadedFile("test.txt", b"Hello", content_type="text/plain")
+
+        url = reverse('file-upload')
+        response = self.client.post(url, {'original_file': test_file, 'pipeline': ['uppercase']}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('Unknown pipeline stage', response.data['pipeline'][0])
 
     def test_get_text_file_detail(self):
         text_file = TextFile.objects.create(
@@ -36,6 +67,17 @@ class TextFileUploadAPITest(APITestCase):
         self.assertEqual(response.data['status'], 'done')
 
 
+    def test_get_text_file_by_trace_id(self):
+        text_file = TextFile.objects.create(original_file='uploads/test.txt', trace_id='0123abcd')
+
+        url = reverse('file-trace-detail', args=['0123abcd'])
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['id'], text_file.id)
+        self.assertEqual(response.data['trace_id'], '0123abcd')
+
+
 class TextFileUploadInvalidFormatAPITest(APITestCase):
     def test_reject_non_text_file(self):
         fake_image = SimpleUploadedFile(
@@ -52,3 +94,98 @@ class TextFileUploadInvalidFormatAPITest(APITestCase):
         self.assertIn('original_file', response.data)
         self.assertIn('Invalid file format', response.data['original_file'][0])
 
+
+class TextFileCancelAPITest(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', password='secret')
+        self.client.force_authenticate(self.owner)
+
+    def test_cancel_pending_file_revokes_task(self):
+        text_file = TextFile.objects.create(original_file='uploads/test.txt', task_id='task-123', user=self.owner)
+
+        url = reverse('file-cancel', args=[text_file.id])
+        with mock.patch.object(process_file_task.app.control, 'revoke') as revoke:
+            response = self.client.post(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'cancelled')
+        revoke.assert_called_once_with('task-123')
+        text_file.refresh_from_db()
+        self.assertEqual(text_file.status, 'cancelled')
+
+    def test_cancel_finished_file_conflict(self):
+        text_file = TextFile.objects.create(original_file='uploads/test.txt', status='done', user=self.owner)
+
+        url = reverse('file-cancel', args=[text_file.id])
+        response = self.client.post(url)
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        text_file.refresh_from_db()
+        self.assertEqual(text_file.status, 'done')
+
+    def test_cancel_requires_owner_or_staff(self):
+        text_file = TextFile.objects.create(original_file='uploads/test.txt', user=self.owner)
+        url = reverse('file-cancel', args=[text_file.id])
+
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(User.objects.create_user('other'))
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_403_FORBIDDEN)
+        text_file.refresh_from_db()
+        self.assertEqual(text_file.status, 'pending')
+
+        self.client.force_authenticate(User.objects.create_user('admin', is_staff=True))
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_200_OK)
+
+
+class TextFileUploadBackpressureAPITest(APITestCase):
+    @override_settings(PROCESSING_MAX_QUEUE_DEPTH=1, PROCESSING_RETRY_AFTER=15)
+    def test_upload_rejected_when_queue_is_full(self):
+        TextFile.objects.create(original_file='uploads/queued.txt', file_size=10)
+        test_file = SimpleUploadedFile("test.txt", b"Hello world", content_type="text/plain")
+
+        url = reverse('file-upload')
+        response = self.client.post(url, {'original_file': test_file}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '15')
+        self.assertEqual(TextFile.objects.count(), 1)
+
+    @override_settings(PROCESSING_MAX_QUEUED_BYTES_PER_USER=100)
+    def test_upload_rejected_when_user_has_too_many_bytes_queued(self):
+        TextFile.objects.create(original_file='uploads/queued.txt', file_size=95, client_address='127.0.0.1')
+        test_file = SimpleUploadedFile("test.txt", b"Hello world", content_type="text/plain")
+
+        url = reverse('file-upload')
+        response = self.client.post(url, {'original_file': test_file}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+
+    @override_settings(PROCESSING_MAX_QUEUED_BYTES_PER_USER=100)
+    def test_anonymous_byte_limit_is_per_client_address(self):
+        TextFile.objects.create(original_file='uploads/queued.txt', file_size=95, client_address='10.0.0.1')
+        test_file = SimpleUploadedFile("test.txt", b"Hello world", content_type="text/plain")
+
+        url = reverse('file-upload')
+        with mock.patch.object(process_file_task, 'apply_async'):
+            response = self.client.post(url, {'original_file': test_file}, format='multipart',
+                                        REMOTE_ADDR='10.0.0.2')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(TextFile.objects.get(pk=response.data['id']).client_address, '10.0.0.2')
+
+    def test_queue_stats(self):
+        TextFile.objects.create(original_file='uploads/waiting.txt', file_size=10, client_address='127.0.0.1')
+        TextFile.objects.create(original_file='uploads/active.txt', file_size=20, status='processing', task_id='t1',
+                                client_address='127.0.0.1')
+        TextFile.objects.create(original_file='uploads/other.txt', file_size=80, client_address='10.0.0.1')
+        TextFile.objects.create(original_file='uploads/done.txt', file_size=40, status='done')
+
+        response = self.client.get(reverse('queue-stats'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['global']['waiting'], 2)
+        self.assertEqual(response.data['global']['active'], 1)
+        self.assertEqual(response.data['global']['queued_bytes'], 110)
+        self.assertEqual(response.data['user']['queued_bytes'], 30)
@@ -0,0 +1,269 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from text_processor.models.models import ProcessingBatch, TextFile
+from text_processor.services.batch_services import BatchDispatcher
+from text_processor.services.scheduling_services import FairScheduler
+from text_processor.tasks.tasks import dispatch_batch_task, process_file_task, sweep_batches_task
+
+
+class BatchDispatcherTest(TestCase):
+    def _files(self, count, **fields):
+        return [TextFile.objects.create(original_file=f'uploads/{i}.txt', status='done', **fields).id
+                for i in range(count)]
+
+    def test_reprocess_resets_finished_files_in_one_batch(self):
+        done = self._files(3, result_file='results/r.txt', error_message='old')
+        running = TextFile.objects.create(original_file='uploads/running.txt', status='processing')
+
+        with mock.patch.object(dispatch_batch_task, 'apply_async'):
+            batch = BatchDispatcher().reprocess(TextFile.objects.all())
+
+        self.assertEqual(batch.total_files, 3)
+        for text_file in TextFile.objects.filter(id__in=done):
+            self.assertEqual((text_file.status, text_file.batch_id), ('pending', batch.id))
+            self.assertFalse(text_file.result_file)
+            self.assertIsNone(text_file.error_message)
+        running.refresh_from_db()
+        self.assertIsNone(running.batch_id)
+
+    def test_reprocess_batch_files_are_not_dispatched_by_fair_scheduler(self):
+        self._files(2)
+        with mock.patch.object(dispatch_batch_task, 'apply_async'):
+            BatchDispatcher().reprocess(TextFile.objects.all())
+
+        with mock.patch.object(process_file_task, 'apply_async') as apply_async:
+            self.assertEqual(FairScheduler().dispatch(), 0)
+        apply_async.assert_not_called()
+
+    def test_run_dispatches_chunks_and_reschedules(self):
+        self._files(5)
+        with mock.patch.object(dispatch_batch_task, 'apply_async'):
+            batch = BatchDispatcher().reprocess(TextFile.objects.all())
+
+        dispatcher = BatchDispatcher()
+        dispatcher.chunk_size, dispatcher.max_in_flight, dispatcher.dispatch_interval = 2, 3, 5
+        with mock.patch('text_processor.services.batch_services.group') as group, \
+                mock.patch.object(dispatch_batch_task, 'apply_async') as schedule:
+            self.assertEqual(dispatcher.run(batch), 2)
+            self.assertEqual(dispatcher.run(batch), 1)  # in-flight limit
+            self.assertEqual(dispatcher.run(batch), 0)
+
+        self.assertEqual(group.return_value.apply_async.call_count, 2)
+        self.assertEqual(schedule.call_count, 3)
+        self.assertEqual(schedule.call_args.kwargs['countdown'], 5)
+        task_ids = list(batch.files.exclude(task_id=None).values_list('id', 'task_id'))
+        self.assertEqual(len(task_ids), 3)
+        self.assertTrue(all(task_id.endswith(f'-{file_id}') for file_id, task_id in task_ids))
+
+    def test_failed_publish_releases_claims(self):
+        self._files(2)
+        with mock.patch.object(dispatch_batch_task, 'apply_async'):
+            batch = BatchDispatcher().reprocess(TextFile.objects.all())
+
+        with mock.patch('text_processor.services.batch_services.group') as group, \
+                mock.patch.object(dispatch_batch_task, 'apply_async') as schedule:
+            group.return_value.apply_async.side_effect = ConnectionError
+            self.assertEqual(BatchDispatcher().run(batch), 0)
+
+        self.assertFalse(batch.files.exclude(task_id=None).exists())
+        schedule.assert_called_once()
+
+    def test_reprocess_renews_traces_and_deletes_previous_results(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        os.makedirs(os.path.join(media_root, 'results'))
+        for name in ['r0.txt', 'r1.txt']:
+            open(os.path.join(media_root, 'results', name), 'w').close()
+        first = TextFile.objects.create(original_file='uploads/0.txt', status='done',
+                                        result_file='results/r0.txt', trace_id='a' * 32)
+        TextFile.objects.create(original_file='uploads/1.txt', status='failed', result_file='results/r1.txt')
+
+        with override_settings(MEDIA_ROOT=media_root), mock.patch.object(dispatch_batch_task, 'apply_async'), \
+                self.captureOnCommitCallbacks(execute=True):
+            BatchDispatcher().reprocess(TextFile.objects.all())
+
+        self.assertEqual(os.listdir(os.path.join(media_root, 'results')), [])
+        trace_ids = set(TextFile.objects.values_list('trace_id', flat=True))
+        self.assertEqual(len(trace_ids), 2)
+        self.assertNotIn(first.trace_id, trace_ids)
+        self.assertTrue(all(len(trace_id) == 32 for trace_id in trace_ids))
+
+    def test_failed_reschedule_does_not_raise(self):
+        self._files(3)
+        with mock.patch.object(dispatch_batch_task, 'apply_async'):
+            batch = BatchDispatcher().reprocess(TextFile.objects.all())
+
+        dispatcher = BatchDispatcher()
+        dispatcher.chunk_size = 1
+        with mock.patch('text_processor.services.batch_services.group'), \
+                mock.patch.object(dispatch_batch_task, 'apply_async', side_effect=ConnectionError):
+            self.assertEqual(dispatcher.run(batch), 1)
+
+    @override_settings(BATCH_DISPATCH_STALE_AFTER=60)
+    def test_sweep_restarts_stalled_batches(self):
+        self._files(2)
+        with mock.patch.object(dispatch_batch_task, 'apply_async'):
+            stalled = BatchDispatcher().reprocess(TextFile.objects.all())
+        ProcessingBatch.objects.filter(pk=stalled.pk).update(updated_at=timezone.now() - timedelta(minutes=5))
+        self._files(1)
+        with mock.patch.object(dispatch_batch_task, 'apply_async'):
+            BatchDispatcher().reprocess(TextFile.objects.filter(batch=None))  # running, not stale
+
+        with mock.patch('text_processor.services.batch_services.group') as group, \
+                mock.patch.object(dispatch_batch_task, 'apply_async'):
+            sweep_batches_task()
+            self.assertEqual(BatchDispatcher().sweep(), 0)
+
+        group.return_value.apply_async.assert_called_once()
+        self.assertFalse(stalled.files.filter(task_id=None).exists())
+
+    def test_progress(self):
+        batch = ProcessingBatch.objects.create(kind='reprocess', total_files=4)
+        for file_status in ['done', 'done', 'failed', 'processing']:
+            TextFile.objects.create(original_file='uploads/f.txt', status=file_status, batch=batch)
+
+        progress = BatchDispatcher.progress(batch)
+
+        self.assertEqual((progress['total'], progress['done'], progress['failed']), (4, 2, 1))
+        self.assertEqual(progress['percent'], 75.0)
+        self.assertFalse(progress['finished'])
+        self.assertEqual(progress['status'], 'processing')
+
+        TextFile.objects.filter(status='processing').update(status='done')
+        self.assertEqual(BatchDispatcher.progress(batch)['status'], 'partially_failed')
+
+
+class TextFileReprocessAPITest(APITestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create(username='admin', is_staff=True)
+
+    def test_reprocess_requires_staff(self):
+        response = self.client.post(reverse('file-reprocess'), {'status': ['failed']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_reprocess_requires_filter(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(reverse('file-reprocess'), {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_reprocess_by_status(self):
+        failed = TextFile.objects.create(original_file='uploads/a.txt', status='failed')
+        TextFile.objects.create(original_file='uploads/b.txt', status='done')
+        self.client.force_authenticate(self.admin)
+
+        with mock.patch.object(dispatch_batch_task, 'apply_async') as schedule, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('file-reprocess'), {'status': ['failed']}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['total_files'], 1)
+        self.assertEqual(response.data['filters'], {'status': ['failed']})
+        schedule.assert_called_once_with(args=[response.data['id']], countdown=0)
+        failed.refresh_from_db()
+        self.assertEqual(failed.batch_id, response.data['id'])
+
+        response = self.client.get(reverse('batch-detail', args=[failed.batch_id]))
+        self.assertEqual(response.data['progress']['pending'], 1)
+
+
+class TextFileBatchUploadAPITest(APITestCase):
+    def _files(self, *names):
+        return [SimpleUploadedFile(name, b"Hello world", content_type="text/plain") for name in names]
+
+    @override_settings(PROCESSING_MAX_ACTIVE_JOBS_PER_USER=3)
+    def test_batch_upload_creates_files_and_dispatches_group(self):
+        url = reverse('file-batch-upload')
+        with mock.patch('text_processor.services.batch_services.group') as group:
+            response = self.client.post(url, {'files': self._files('a.txt', 'b.csv', 'c.txt'),
+                                              'pipeline': ['lowercase', 'shuffle']}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['kind'], 'upload')
+        self.assertEqual(response.data['total_files'], 3)
+        self.assertEqual(response.data['progress']['status'], 'pending')
+        self.assertEqual(len(response.data['files']), 3)
+        group.return_value.apply_async.assert_called_once()
+        self.assertEqual(len(list(group.call_args.args[0])), 3)
+
+        files = TextFile.objects.filter(batch_id=response.data['id'])
+        self.assertEqual(files.count(), 3)
+        self.assertTrue(all(f.pipeline == ['lowercase', 'shuffle'] and f.task_id and f.trace_id for f in files))
+        self.assertEqual(len({f.trace_id for f in files}), 3)
+        self.assertTrue(all(f.original_file.storage.exists(f.original_file.name) for f in files))
+
+    def test_batch_upload_rejects_invalid_file(self):
+        url = reverse('file-batch-upload')
+        response = self.client.post(url, {'files': self._files('a.txt', 'image.jpg')}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(1, response.data['files'])
+        self.assertFalse(TextFile.objects.exists())
+
+    @override_settings(PROCESSING_MAX_ACTIVE_JOBS_PER_USER=2)
+    def test_batch_upload_stays_within_owner_active_limit(self):
+        owner = get_user_model().objects.create(username='owner')
+        TextFile.objects.create(user=owner, original_file='uploads/running.txt', status='processing')
+        self.client.force_authenticate(owner)
+
+        with mock.patch('text_processor.services.batch_services.group') as group, \
+                mock.patch.object(dispatch_batch_task, 'apply_async'):
+            response = self.client.post(reverse('file-batch-upload'),
+                                        {'files': self._files('a.txt', 'b.txt', 'c.txt')}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(list(group.call_args.args[0])), 1)
+        self.assertEqual(TextFile.objects.filter(batch_id=response.data['id'], task_id=None).count(), 2)
+
+    @override_settings(PROCESSING_MAX_ACTIVE_JOBS_PER_USER=2)
+    def test_finished_job_slot_is_refilled_from_upload_batch(self):
+        owner = get_user_model().objects.create(username='owner')
+        self.client.force_authenticate(owner)
+        with mock.patch('text_processor.services.batch_services.group'), \
+                mock.patch.object(dispatch_batch_task, 'apply_async'):
+            response = self.client.post(reverse('file-batch-upload'),
+                                        {'files': self._files('a.txt', 'b.txt', 'c.txt', 'd.txt')}, format='multipart')
+        files = TextFile.objects.filter(batch_id=response.data['id']).order_by('id')
+        self.assertEqual(files.filter(task_id=None).count(), 2)
+
+        files.filter(id=files[0].id).update(status='done')
+        with mock.patch.object(process_file_task, 'apply_async') as apply_async:
+            self.assertEqual(FairScheduler().dispatch(), 1)  # the freed slot, not the next batch run
+        self.assertEqual(apply_async.call_args.kwargs['args'], [files[2].id])
+        self.assertEqual(files.filter(task_id=None).count(), 1)
+
+    @override_settings(PROCESSING_MAX_QUEUE_DEPTH=3)
+    def test_batch_upload_admission_counts_every_file(self):
+        TextFile.objects.create(original_file='uploads/queued.txt')
+
+        response = self.client.post(reverse('file-batch-upload'),
+                                    {'files': self._files('a.txt', 'b.txt', 'c.txt')}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(TextFile.objects.count(), 1)
+
+    def test_batch_upload_is_kept_when_broker_is_down(self):
+        with mock.patch('text_processor.services.batch_services.group') as group, \
+                mock.patch.object(dispatch_batch_task, 'apply_async', side_effect=ConnectionError):
+            group.return_value.apply_async.side_effect = ConnectionError
+            response = self.client.post(reverse('file-batch-upload'),
+                                        {'files': self._files('a.txt', 'b.txt')}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        batch = ProcessingBatch.objects.get(pk=response.data['id'])
+        self.assertEqual(batch.files.filter(status='pending', task_id=None).count(), 2)
+
+        ProcessingBatch.objects.filter(pk=batch.pk).update(updated_at=timezone.now() - timedelta(minutes=5))
+        with mock.patch('text_processor.services.batch_services.group'), \
+                mock.patch.object(dispatch_batch_task, 'apply_async'):
+            self.assertEqual(BatchDispatcher().sweep(), 1)
+        self.assertFalse(batch.files.filter(task_id=None).exists())
@@ -0,0 +1,91 @@
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from text_processor.models.models import TextFile
+from text_processor.services.scheduling_services import FairScheduler
+from text_processor.tasks.tasks import dispatch_pending_task, process_file_task
+
+
+@override_settings(PROCESSING_MAX_ACTIVE_JOBS_PER_USER=2)
+class FairSchedulerTest(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.heavy = User.objects.create(username='heavy')
+        self.light = User.objects.create(username='light')
+
+    def _dispatch(self):
+        with mock.patch.object(process_file_task, 'apply_async') as apply_async:
+            dispatched = FairScheduler().dispatch()
+        return dispatched, [call.kwargs['args'][0] for call in apply_async.call_args_list]
+
+    def test_dispatch_interleaves_users_and_respects_active_limit(self):
+        heavy_jobs = [TextFile.objects.create(user=self.heavy, original_file=f'uploads/h{i}.txt').id for i in range(5)]
+        light_jobs = [TextFile.objects.create(user=self.light, original_file=f'uploads/l{i}.txt').id for i in range(2)]
+
+        dispatched, order = self._dispatch()
+
+        self.assertEqual(dispatched, 4)
+        self.assertEqual(sorted(order[:2]), sorted([heavy_jobs[0], light_jobs[0]]))
+        self.assertEqual(sorted(order[2:]), sorted([heavy_jobs[1], light_jobs[1]]))
+        self.assertEqual(TextFile.objects.filter(task_id__isnull=False).count(), 4)
+
+    def test_dispatch_prefers_users_with_fewer_active_jobs(self):
+        TextFile.objects.create(user=self.heavy, original_file='uploads/running.txt', status='processing', task_id='t1')
+        heavy_job = TextFile.objects.create(user=self.heavy, original_file='uploads/h.txt').id
+        light_job = TextFile.objects.create(user=self.light, original_file='uploads/l.txt').id
+
+        _, order = self._dispatch()
+
+        self.assertEqual(order, [light_job, heavy_job])
+
+    def test_dispatch_schedules_anonymous_clients_separately(self):
+        TextFile.objects.create(original_file='uploads/running.txt', status='processing', task_id='t1',
+                                client_address='10.0.0.1')
+        flood = [TextFile.objects.create(original_file=f'uploads/f{i}.txt', client_address='10.0.0.1').id
+                 for i in range(5)]
+        other = [TextFile.objects.create(original_file=f'uploads/o{i}.txt', client_address='10.0.0.2').id
+                 for i in range(2)]
+
+        dispatched, order = self._dispatch()
+
+        self.assertEqual(dispatched, 3)
+        self.assertEqual(sorted(order), sorted([flood[0]] + other))
+        self.assertEqual(FairScheduler().free_slots(None, '10.0.0.1'), 0)
+        self.assertEqual(FairScheduler().free_slots(None, '10.0.0.3'), 2)
+
+    def test_dispatch_does_not_redispatch_claimed_jobs(self):
+        TextFile.objects.create(user=self.light, original_file='uploads/l.txt')
+
+        self.assertEqual(self._dispatch()[0], 1)
+        self.assertEqual(self._dispatch()[0], 0)
+
+    def test_failed_publish_releases_claim(self):
+        text_file = TextFile.objects.create(user=self.light, original_file='uploads/l.txt')
+
+        with mock.patch.object(process_file_task, 'apply_async', side_effect=ConnectionError):
+            self.assertEqual(FairScheduler().dispatch(), 0)
+
+        text_file.refresh_from_db()
+        self.assertIsNone(text_file.task_id)
+
+    @override_settings(PROCESSING_STALE_TIMEOUT=60)
+    def test_periodic_dispatch_recovers_stale_jobs(self):
+        long_ago = timezone.now() - timedelta(minutes=5)
+        for i in range(2):
+            lost = TextFile.objects.create(user=self.heavy, original_file=f'uploads/lost{i}.txt',
+                                           status='processing', task_id=f't{i}')
+            TextFile.objects.filter(pk=lost.pk).update(updated_at=long_ago)
+        running = TextFile.objects.create(user=self.light, original_file='uploads/running.txt',
+                                          status='processing', task_id='t2')
+        waiting = TextFile.objects.create(user=self.heavy, original_file='uploads/h.txt')
+
+        with mock.patch.object(process_file_task, 'apply_async') as apply_async:
+            dispatch_pending_task()
+
+        self.assertEqual(TextFile.objects.filter(status='failed').count(), 2)
+        self.assertIn("within 60 seconds", TextFile.objects.filter(status='failed').first().error_message)
+        running.refresh_from_db()
+        self.assertEqual(running.status, 'processing')
+        self.assertEqual([call.kwargs['args'][0] for call in apply_async.call_args_list], [waiting.id])
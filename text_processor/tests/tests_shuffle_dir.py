@@ -0,0 +1,69 @@
+import io
+import os
+import shutil
+import tempfile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase
+
+
+class ShuffleDirCommandTest(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.source = os.path.join(self.root, 'source')
+        self.destination = os.path.join(self.root, 'shuffled')
+        self._write('a.txt', "Hello world\n")
+        self._write(os.path.join('nested', 'deeper', 'b.csv'), "Name,City\nAlice,London\n")
+        self._write('notes.pdf', "not supported")
+
+    def _write(self, name, content):
+        path = os.path.join(self.source, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    def _run(self, *args):
+        out = io.StringIO()
+        call_command('shuffle_dir', self.source, self.destination, '--workers', '2', *args, stdout=out)
+        return out.getvalue()
+
+    def test_mirrors_source_tree(self):
+        output = self._run('--pipeline', 'lowercase')
+
+        self.assertIn("Processed 2 files", output)
+        self.assertIn("1 unsupported", output)
+        with open(os.path.join(self.destination, 'a.txt'), encoding='utf-8') as f:
+            self.assertEqual(f.read(), "hello world\n")
+        with open(os.path.join(self.destination, 'nested', 'deeper', 'b.csv'), encoding='utf-8') as f:
+            self.assertEqual(f.read().splitlines(), ["name,city", "alice,london"])
+        self.assertFalse(os.path.exists(os.path.join(self.destination, 'notes.pdf')))
+
+    def test_rerun_skips_finished_files(self):
+        self._run()
+        self._write('c.txt', "Another file\n")
+
+        output = self._run()
+        self.assertIn("Processed 1 files", output)
+        self.assertIn("Skipped 2 already processed", output)
+        self.assertIn("Processed 3 files", self._run('--force'))
+
+    def test_destination_inside_source_is_not_processed(self):
+        self.destination = os.path.join(self.source, 'shuffled')
+        self._run()
+
+        self.assertIn("Processed 0 files", self._run())
+        self.assertFalse(os.path.exists(os.path.join(self.destination, 'shuffled')))
+
+    def test_failed_files_are_reported(self):
+        with open(os.path.join(self.source, 'broken.txt'), 'wb') as f:
+            f.write(b"\xff\xfe")
+
+        with self.assertRaisesMessage(CommandError, "1 files failed"):
+            self._run()
+        self.assertTrue(os.path.exists(os.path.join(self.destination, 'a.txt')))
+        self.assertFalse(os.path.exists(os.path.join(self.destination, 'broken.txt')))
+
+    def test_invalid_pipeline(self):
+        with self.assertRaisesMessage(CommandError, "Unknown pipeline stage"):
+            self._run('--pipeline', 'reverse')
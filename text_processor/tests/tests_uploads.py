@@ -0,0 +1,190 @@
+import fcntl
+import io
+import shutil
+import tempfile
+import threading
+import uuid
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from text_processor.exceptions import UploadSessionClosed
+from text_processor.models.models import TextFile, UploadSession
+from text_processor.services.upload_services import ChunkedUploadService
+from text_processor.tasks.tasks import cleanup_upload_sessions_task, process_file_task
+
+
+@override_settings(UPLOAD_CHUNK_SIZE=4)
+class ChunkedUploadAPITest(APITestCase):
+    content = b"Hello world\n"
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        override = override_settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.owner = User.objects.create_user('owner')
+        self.client.force_authenticate(self.owner)
+
+    def _create_session(self, **data):
+        data = {'filename': 'big.txt', 'total_size': len(self.content), **data}
+        return self.client.post(reverse('upload-session-create'), data, format='json')
+
+    def _put_chunk(self, session_id, number, data, **headers):
+        url = reverse('upload-chunk', args=[session_id, number])
+        return self.client.put(url, data, content_type='application/octet-stream', headers=headers)
+
+    def test_upload_in_chunks_out_of_order_and_finalize(self):
+        response = self._create_session(pipeline=['lowercase', 'shuffle'])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        session_id = response.data['id']
+        self.assertEqual(response.data['missing_chunks'], [0, 1, 2])
+
+        self._put_chunk(session_id, 2, self.content[8:])
+        response = self._put_chunk(session_id, 0, self.content[:4], **{'Content-Range': 'bytes 0-3/12'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['received'], [[0, 4], [8, 12]])
+
+        finalize_url = reverse('upload-session-finalize', args=[session_id])
+        response = self.client.post(finalize_url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(TextFile.objects.count(), 0)
+
+        response = self.client.get(reverse('upload-session-detail', args=[session_id]))
+        self.assertEqual(response.data['missing_chunks'], [1])
+        self._put_chunk(session_id, 1, self.content[4:8])
+
+        with mock.patch.object(process_file_task, 'apply_async') as apply_async:
+            response = self.client.post(finalize_url)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        apply_async.assert_called_once()
+
+        text_file = TextFile.objects.get()
+        self.assertEqual(response['X-Trace-Id'], text_file.trace_id)
+        self.assertEqual(text_file.pipeline, ['lowercase', 'shuffle'])
+        self.assertEqual(text_file.file_size, len(self.content))
+        with text_file.original_file.open('rb') as f:
+            self.assertEqual(f.read(), self.content)
+
+        # Finalizing again returns the same file; no more chunks are accepted.
+        response = self.client.post(finalize_url)
+        self.assertEqual((response.status_code, response.data['id']), (status.HTTP_200_OK, text_file.id))
+        self.assertEqual(self._put_chunk(session_id, 0, self.content[:4]).status_code, status.HTTP_409_CONFLICT)
+
+    def test_reject_chunk_with_wrong_length_or_range(self):
+        session_id = self._create_session().data['id']
+
+        self.assertEqual(self._put_chunk(session_id, 0, b"abc").status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._put_chunk(session_id, 3, b"abcd").status_code, status.HTTP_400_BAD_REQUEST)
+        response = self._put_chunk(session_id, 1, b"abcd", **{'Content-Range': 'bytes 0-3/12'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(UploadSession.objects.get().received, [])
+
+    def test_reject_unsupported_file_type(self):
+        response = self._create_session(filename='image.jpg')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('Invalid file format', response.data['filename'][0])
+
+    def test_abort_upload(self):
+        session_id = self._create_session().data['id']
+
+        response = self.client.delete(reverse('upload-session-detail', args=[session_id]))
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(UploadSession.objects.exists())
+
+    def test_session_is_restricted_to_owner(self):
+        session_id = self._create_session().data['id']
+        urls = [reverse('upload-session-detail', args=[session_id]),
+                reverse('upload-chunk', args=[session_id, 0]),
+                reverse('upload-session-finalize', args=[session_id])]
+
+        self.client.force_authenticate(User.objects.create_user('other'))
+        self.assertEqual(self.client.get(urls[0]).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self._put_chunk(session_id, 0, self.content[:4]).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.post(urls[2]).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.delete(urls[0]).status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(None)
+        self.assertEqual(self._create_session().status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(UploadSession.objects.get().received, [])
+
+    def test_chunk_racing_finalize_is_rejected(self):
+        session_id = self._create_session().data['id']
+        # A chunk request that loaded the session before it was finalized.
+        racing = ChunkedUploadService(UploadSession.objects.get(pk=session_id))
+        for number in range(3):
+            self._put_chunk(session_id, number, self.content[number * 4:number * 4 + 4])
+
+        with mock.patch.object(process_file_task, 'apply_async'):
+            self.client.post(reverse('upload-session-finalize', args=[session_id]))
+
+        with self.assertRaises(UploadSessionClosed):
+            racing.write_chunk(0, io.BytesIO(self.content[:4]), 4)
+
+    def test_chunk_is_not_written_into_file_moved_by_finalize(self):
+        session_id = self._create_session().data['id']
+        for number in range(3):
+            self._put_chunk(session_id, number, self.content[number * 4:number * 4 + 4])
+        racing = ChunkedUploadService(UploadSession.objects.get(pk=session_id))
+        flock = fcntl.flock
+
+        def finalize_then_lock(f, operation):
+            # Finalize moves the file after the chunk opened it, but before it got its lock.
+            if operation == fcntl.LOCK_SH:
+                with mock.patch.object(process_file_task, 'apply_async'):
+                    ChunkedUploadService(UploadSession.objects.get(pk=session_id)).finalize()
+            flock(f, operation)
+
+        with mock.patch('fcntl.flock', side_effect=finalize_then_lock), self.assertRaises(UploadSessionClosed):
+            racing.write_chunk(0, io.BytesIO(b"XXXX"), 4)
+
+        text_file = TextFile.objects.get()
+        with text_file.original_file.open('rb') as f:
+            self.assertEqual(f.read(), self.content)
+
+    def test_finalize_waits_for_chunk_being_written(self):
+        session_id = self._create_session().data['id']
+        for number in range(3):
+            self._put_chunk(session_id, number, self.content[number * 4:number * 4 + 4])
+        staging = default_storage.path(f'uploads/partial/{session_id}.part')
+        locked, release, written = threading.Event(), threading.Event(), threading.Event()
+
+        def write_chunk():
+            with open(staging, 'r+b') as f:
+                fcntl.flock(f, fcntl.LOCK_SH)
+                locked.set()
+                release.wait(5)
+                f.write(b"HELL")
+                written.set()
+
+        writer = threading.Thread(target=write_chunk)
+        writer.start()
+        locked.wait(5)
+        threading.Timer(0.2, release.set).start()
+        with mock.patch.object(process_file_task, 'apply_async'):
+            response = self.client.post(reverse('upload-session-finalize', args=[session_id]))
+        finalized_after_write = written.is_set()
+        writer.join()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(finalized_after_write)
+        with TextFile.objects.get().original_file.open('rb') as f:
+            self.assertEqual(f.read(), b"HELL" + self.content[4:])
+
+    def test_expired_sessions_are_cleaned_up(self):
+        expired_id = self._create_session().data['id']
+        active_id = self._create_session().data['id']
+        UploadSession.objects.filter(pk=expired_id).update(updated_at=timezone.now() - timedelta(days=2))
+        staging = f'uploads/partial/{expired_id}.part'
+        self.assertTrue(default_storage.exists(staging))
+
+        cleanup_upload_sessions_task()
+
+        self.assertEqual(list(UploadSession.objects.values_list('id', flat=True)), [uuid.UUID(active_id)])
+        self.assertFalse(default_storage.exists(staging))
@@ -0,0 +1,57 @@
+import json
+import os
+import threading
+
+from django.conf import settings
+
+
+class BaseSpanExporter:
+    """
+    Base class for span exporters.
+
+    An exporter receives every finished span and sends it somewhere (a file,
+    a collector, a log, ...). The exporter used by the application is configured
+    with the `TRACING_EXPORTER` setting (dotted path to an exporter class).
+    Subclasses must implement `export()`; it is called synchronously on the
+    request or task thread, so it should be cheap and must not raise.
+    """
+
+    def export(self, span):
+        """
+        Export a single finished span.
+
+        Args:
+            span (Span): The finished span.
+        """
+        raise NotImplementedError
+
+
+class NullSpanExporter(BaseSpanExporter):
+    """Discards all spans. Used when tracing output is disabled."""
+
+    def export(self, span):
+        pass
+
+
+class JsonLinesSpanExporter(BaseSpanExporter):
+    """
+    Appends spans as JSON objects, one per line, to a local file.
+
+    The file can be inspected with standard tools, e.g.
+    `grep <trace_id> traces.jsonl | jq .` shows all spans of one job. Each span is
+    written with a single append, so several web and worker processes on the same
+    host can share one file.
+
+    Args:
+        path (str, optional): File to append to. Defaults to the `TRACING_JSONL_PATH` setting.
+    """
+
+    def __init__(self, path=None):
+        self.path = str(path or settings.TRACING_JSONL_PATH)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+    def export(self, span):
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
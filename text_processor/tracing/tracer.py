@@ -0,0 +1,175 @@
+import contextlib
+import contextvars
+import logging
+import time
+import uuid
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+_current_trace_id = contextvars.ContextVar("trace_id", default=None)
+_current_span_id = contextvars.ContextVar("span_id", default=None)
+_exporter = None
+
+
+class Span:
+    """
+    A single timed operation within a trace.
+
+    Attributes:
+        name (str): Operation name, e.g. "upload.write" or "transform".
+        trace_id (str): ID of the trace (one uploaded file) the span belongs to.
+        span_id (str): Unique ID of this span.
+        parent_id (str | None): ID of the enclosing span, if any.
+        start (float): Start time as a UNIX timestamp.
+        end (float | None): End time as a UNIX timestamp.
+        attributes (dict): Additional span data (file ID, status, error, ...).
+    """
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start", "end", "attributes")
+
+    def __init__(self, name, trace_id, parent_id=None, start=None, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.start = time.time() if start is None else start
+        self.end = None
+        self.attributes = attributes or {}
+
+    @property
+    def duration(self):
+        """Span duration in seconds, or None if the span has not finished."""
+        return None if self.end is None else self.end - self.start
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "end": self.end,
+            "duration": self.duration,
+            "attributes": self.attributes,
+        }
+
+
+def new_trace_id():
+    """Returns a new random trace ID."""
+    return uuid.uuid4().hex
+
+
+def get_trace_id():
+    """Returns the ID of the active trace, or None outside of a trace."""
+    return _current_trace_id.get()
+
+
+def get_exporter():
+    """
+    Returns the configured span exporter, creating it on first use.
+
+    The exporter class is loaded from the `TRACING_EXPORTER` setting.
+    """
+    global _exporter
+    if _exporter is None:
+        _exporter = import_string(settings.TRACING_EXPORTER)()
+    return _exporter
+
+
+@contextlib.contextmanager
+def trace(trace_id=None):
+    """
+    Activate a trace for the enclosed code.
+
+    Spans recorded inside the block belong to this trace. The active trace is
+    stored in a context variable, so it follows the code across function calls
+    (views, services, processors) without being passed around explicitly.
+
+    Args:
+        trace_id (str, optional): ID of an existing trace to continue, e.g. one
+            received in Celery task headers. A new ID is generated if omitted.
+            If it is the already active trace, spans keep nesting under the
+            current span.
+
+    Yields:
+        str: The active trace ID.
+    """
+    if trace_id and trace_id == _current_trace_id.get():
+        yield trace_id
+        return
+
+    trace_id = trace_id or new_trace_id()
+    trace_token = _current_trace_id.set(trace_id)
+    span_token = _current_span_id.set(None)
+    try:
+        yield trace_id
+    finally:
+        _current_span_id.reset(span_token)
+        _current_trace_id.reset(trace_token)
+
+
+@contextlib.contextmanager
+def span(name, **attributes):
+    """
+    Record a span around the enclosed code.
+
+    Outside of an active trace this is a no-op. If the block raises, the
+    exception type and message are stored in the span's `error` attribute
+    and the exception is re-raised.
+
+    Args:
+        name (str): Span name.
+        **attributes: Additional span data.
+
+    Yields:
+        Span | None: The span being recorded (attributes may be added to it),
+        or None outside of a trace.
+    """
+    trace_id = _current_trace_id.get()
+    if trace_id is None:
+        yield None
+        return
+
+    current = Span(name, trace_id, parent_id=_current_span_id.get(), attributes=attributes)
+    token = _current_span_id.set(current.span_id)
+    try:
+        yield current
+    except BaseException as e:
+        current.attributes["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span_id.reset(token)
+        current.end = time.time()
+        _export(current)
+
+
+def record_span(name, start, end=None, **attributes):
+    """
+    Record a span for an operation that was not run inside a `span()` block.
+
+    Used for intervals measured across processes, such as the time a task spent
+    waiting in the broker queue. Outside of an active trace this is a no-op.
+
+    Args:
+        name (str): Span name.
+        start (float): Start time as a UNIX timestamp.
+        end (float, optional): End time as a UNIX timestamp. Defaults to now.
+        **attributes: Additional span data.
+    """
+    trace_id = _current_trace_id.get()
+    if trace_id is None:
+        return
+    recorded = Span(name, trace_id, parent_id=_current_span_id.get(), start=start, attributes=attributes)
+    recorded.end = time.time() if end is None else end
+    _export(recorded)
+
+
+def _export(finished_span):
+    try:
+        get_exporter().export(finished_span)
+    except Exception as e:
+        # Tracing must never break request handling or processing.
+        logger.warning(f"Could not export span '{finished_span.name}': {e}")
@@ -1,8 +1,21 @@
 from django.urls import path
-from .views.text_file_views import TextFileUploadView, TextFileDetailView, index
+from .views.text_file_views import TextFileUploadView, TextFileDetailView, TextFileTraceDetailView, TextFileCancelView, QueueStatsView, \
+    TextFileReprocessView, ProcessingBatchDetailView, TextFileBatchUploadView, index
+from .views.upload_views import UploadSessionCreateView, UploadSessionDetailView, UploadChunkView, \
+    UploadSessionFinalizeView
 
 urlpatterns = [
     path('', index, name='index'),
     path('upload/', TextFileUploadView.as_view(), name='file-upload'),
+    path('upload/batch/', TextFileBatchUploadView.as_view(), name='file-batch-upload'),
     path('file/<int:pk>/', TextFileDetailView.as_view(), name='file-detail'),
+    path('file/trace/<str:trace_id>/', TextFileTraceDetailView.as_view(), name='file-trace-detail'),
+    path('file/<int:pk>/cancel/', TextFileCancelView.as_view(), name='file-cancel'),
+    path('uploads/', UploadSessionCreateView.as_view(), name='upload-session-create'),
+    path('uploads/<uuid:pk>/', UploadSessionDetailView.as_view(), name='upload-session-detail'),
+    path('uploads/<uuid:pk>/chunks/<int:number>/', UploadChunkView.as_view(), name='upload-chunk'),
+    path('uploads/<uuid:pk>/finalize/', UploadSessionFinalizeView.as_view(), name='upload-session-finalize'),
+    path('queue/', QueueStatsView.as_view(), name='queue-stats'),
+    path('reprocess/', TextFileReprocessView.as_view(), name='file-reprocess'),
+    path('batch/<int:pk>/', ProcessingBatchDetailView.as_view(), name='batch-detail'),
 ]
@@ -0,0 +1,134 @@
+import math
+import random
+import re
+
+_SIZE_UNITS = {
+    "": 1,
+    "B": 1,
+    "KB": 1024,
+    "MB": 1024 ** 2,
+    "GB": 1024 ** 3,
+}
+
+_SIZE_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMG]?B?)\s*$", re.IGNORECASE)
+
+_WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua enim ad minim veniam quis nostrud "
+    "exercitation ullamco laboris nisi aliquip ex ea commodo consequat"
+).split()
+
+
+def parse_size(value: str) -> int:
+    """
+    Parses a human-readable size such as "512", "64KB", "1.5MB" or "2GB" into bytes.
+
+    Args:
+        value (str): Size with an optional unit (B, KB, MB, GB; case-insensitive).
+
+    Raises:
+        ValueError: If the value cannot be parsed.
+
+    Returns:
+        int: Size in bytes.
+    """
+    match = _SIZE_PATTERN.match(value)
+    if not match:
+        raise ValueError(f"Invalid size '{value}'. Expected e.g. '512', '64KB', '5MB'.")
+    number, unit = match.groups()
+    unit = unit.upper()
+    if unit and not unit.endswith("B"):
+        unit += "B"
+    return int(float(number) * _SIZE_UNITS[unit])
+
+
+def parse_size_mix(value: str) -> list[tuple[int, int]]:
+    """
+    Parses a file size mix such as "1KB:70,100KB:25,5MB:5".
+
+    Each comma-separated entry is a size and a relative weight; the weight
+    defaults to 1 when omitted.
+
+    Args:
+        value (str): Size mix specification.
+
+    Raises:
+        ValueError: If an entry is invalid or all weights are zero.
+
+    Returns:
+        list[tuple[int, int]]: List of `(size_in_bytes, weight)` pairs.
+    """
+    mix = []
+    for entry in value.split(","):
+        if not entry.strip():
+            continue
+        size, _, weight = entry.partition(":")
+        weight = int(weight) if weight.strip() else 1
+        if weight < 0:
+            raise ValueError(f"Invalid weight in size mix entry '{entry}'.")
+        mix.append((parse_size(size), weight))
+    if not mix or not any(weight for _, weight in mix):
+        raise ValueError(f"Size mix '{value}' does not contain any positive weight.")
+    return mix
+
+
+def generate_text(size: int, rng: random.Random) -> bytes:
+    """
+    Generates roughly `size` bytes of pseudo-random text made of short lines of words.
+
+    Args:
+        size (int): Target size in bytes.
+        rng (random.Random): Random number generator used for word selection.
+
+    Returns:
+        bytes: UTF-8 encoded text of exactly `size` bytes.
+    """
+    lines = []
+    total = 0
+    while total < size:
+        line = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(5, 15))) + "\n"
+        lines.append(line)
+        total += len(line)
+    return "".join(lines).encode("utf-8")[:size]
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    """
+    Returns the `pct`-th percentile of `values` using linear interpolation.
+
+    Args:
+        values (list[float]): Sample values (need not be sorted).
+        pct (float): Percentile between 0 and 100.
+
+    Returns:
+        float | None: The percentile, or None if `values` is empty.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(values: list[float]) -> dict:
+    """
+    Summarizes a list of durations (in seconds) for reporting.
+
+    Args:
+        values (list[float]): Sample values.
+
+    Returns:
+        dict: Count, mean, min, max and p50/p90/p95/p99 of the values
+        (statistics are None when there are no samples).
+    """
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values) if values else None,
+        "min": min(values, default=None),
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values, default=None),
+    }
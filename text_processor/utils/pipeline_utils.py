@@ -0,0 +1,186 @@
+import re
+from typing import Callable, Iterable, List
+
+from text_processor.utils.text_utils import shuffle_text_line
+
+EMAIL_MASK = '[email]'
+NUMBER_MASK = '[number]'
+
+_EMAIL = r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+'
+_NUMBER = r'\d+(?:\.\d+)?'
+_EMAIL_RE = re.compile(_EMAIL)
+_NUMBER_RE = re.compile(_NUMBER)
+# Emails first: a number touching an email is part of its local part.
+_EMAIL_OR_NUMBER_RE = re.compile(f'({_EMAIL})|{_NUMBER}')
+_MASK_TOKEN_RE = re.compile(f'({re.escape(EMAIL_MASK)}|{re.escape(NUMBER_MASK)})')
+
+
+def lowercase(text: str) -> str:
+    """Converts the text to lowercase."""
+    return text.lower()
+
+
+def mask_emails(text: str) -> str:
+    """Replaces every email address with `EMAIL_MASK`."""
+    return _EMAIL_RE.sub(EMAIL_MASK, text)
+
+
+def mask_numbers(text: str) -> str:
+    """Replaces every number (including decimals such as `3.14`) with `NUMBER_MASK`."""
+    return _NUMBER_RE.sub(NUMBER_MASK, text)
+
+
+def mask_emails_and_numbers(text: str) -> str:
+    """
+    Same as `mask_numbers(mask_emails(text))`, in a single regex scan.
+
+    Every character of a number may also appear in an email's local part, so a
+    number can never overlap an email that starts after it: whenever both patterns
+    could match, the email match starts first and wins, exactly as in two passes.
+    """
+    return _EMAIL_OR_NUMBER_RE.sub(lambda m: EMAIL_MASK if m.group(1) else NUMBER_MASK, text)
+
+
+def shuffle_letters(text: str) -> str:
+    """
+    Punctuation-aware variant of `shuffle_text_line`.
+
+    Words are split on anything that is not a letter, so punctuation, digits and
+    whitespace stay exactly where they are: `"Hello, world!"` keeps its comma and
+    exclamation mark, and only the letters inside `Hello` and `world` are shuffled.
+    """
+    return shuffle_text_line(text, punctuation_aware=True)
+
+
+#: Built-in pipeline stages, by the name used in `TextFile.pipeline`.
+PIPELINE_STAGES = {
+    'lowercase': lowercase,
+    'mask_emails': mask_emails,
+    'mask_numbers': mask_numbers,
+    'shuffle': shuffle_text_line,
+    'shuffle_letters': shuffle_letters,
+}
+
+DEFAULT_PIPELINE = ['shuffle']
+
+# Masking must see the text before shuffling moves the `@` and `.` characters it matches.
+MASK_STAGES = frozenset({'mask_emails', 'mask_numbers'})
+SHUFFLE_STAGES = frozenset({'shuffle', 'shuffle_letters'})
+
+# Adjacent stages that are replaced by one equivalent, cheaper function.
+_FUSED_STAGES = {
+    ('mask_emails', 'mask_numbers'): mask_emails_and_numbers,
+}
+
+
+def default_pipeline() -> List[str]:
+    """Returns a new list with the default pipeline (used as the model field default)."""
+    return list(DEFAULT_PIPELINE)
+
+
+def validate_pipeline(stages: Iterable[str]) -> List[str]:
+    """
+    Checks that `stages` is a non-empty list of known stage names.
+
+    Args:
+        stages (Iterable[str]): Stage names, in the order they are applied.
+
+    Raises:
+        ValueError: If the pipeline is empty or contains an unknown stage.
+
+    Returns:
+        list[str]: The stage names.
+    """
+    if isinstance(stages, str):
+        raise ValueError("The pipeline must be a list of stage names.")
+    stages = list(stages or [])
+    if not stages:
+        raise ValueError("The pipeline must contain at least one stage.")
+    unknown = [name for name in stages if name not in PIPELINE_STAGES]
+    if unknown:
+        raise ValueError(
+            f"Unknown pipeline stage(s): {', '.join(map(str, unknown))}. "
+            f"Available stages: {', '.join(PIPELINE_STAGES)}."
+        )
+    return stages
+
+
+def _masks_first(names: List[str]) -> List[str]:
+    """Moves masking stages that follow a shuffling stage in front of the first shuffling stage."""
+    first_shuffle = next((i for i, name in enumerate(names) if name in SHUFFLE_STAGES), len(names))
+    tail = names[first_shuffle:]
+    return (
+        names[:first_shuffle]
+        + [name for name in tail if name in MASK_STAGES]
+        + [name for name in tail if name not in MASK_STAGES]
+    )
+
+
+def _keep_mask_tokens(stage: Callable[[str], str]) -> Callable[[str], str]:
+    """Wraps `stage` so it only transforms the text between `EMAIL_MASK` / `NUMBER_MASK` tokens."""
+    def protected(text: str) -> str:
+        parts = _MASK_TOKEN_RE.split(text)
+        parts[::2] = map(stage, parts[::2])
+        return ''.join(parts)
+
+    return protected
+
+
+def compile_pipeline(stages: Iterable[str]) -> Callable[[str], str]:
+    """
+    Compiles a pipeline of stage names into a single text transform.
+
+    The returned function applies all stages to a piece of text (a line, a line
+    chunk or a CSV cell) one after another, so a processor runs the whole
+    pipeline in one streaming pass over the file instead of one pass per stage.
+    Adjacent stages with a fused equivalent (e.g. both masking stages, which then
+    share one regex scan) are merged, and a single-stage pipeline compiles to the
+    stage function itself.
+
+    Masking stages always run before the shuffling stages, wherever they are
+    listed: shuffling moves the `@` and `.` inside a word, so an email shuffled
+    first would no longer be recognised and would leak. Shuffling stages that run
+    after a mask leave the mask tokens (`[email]`, `[number]`) untouched.
+
+    No stage matches across whitespace, so the transform can also be applied to
+    the chunks a long line is split into at whitespace.
+
+    Args:
+        stages (Iterable[str]): Stage names, in the order they are applied.
+
+    Raises:
+        ValueError: If the pipeline is invalid (see `validate_pipeline`).
+
+    Returns:
+        Callable[[str], str]: The fused transform.
+    """
+    names = _masks_first(validate_pipeline(stages))
+
+    functions = []
+    masked = False
+    i = 0
+    while i < len(names):
+        fused = _FUSED_STAGES.get(tuple(names[i:i + 2]))
+        if fused:
+            functions.append(fused)
+            i += 2
+            masked = True
+            continue
+        function = PIPELINE_STAGES[names[i]]
+        if names[i] in SHUFFLE_STAGES and masked:
+            function = _keep_mask_tokens(function)
+        masked = masked or names[i] in MASK_STAGES
+        functions.append(function)
+        i += 1
+
+    if len(functions) == 1:
+        return functions[0]
+
+    functions = tuple(functions)
+
+    def transform(text: str) -> str:
+        for function in functions:
+            text = function(text)
+        return text
+
+    return transform
@@ -0,0 +1,123 @@
+import os
+import time
+
+from django.conf import settings
+
+from text_processor.exceptions import BudgetExceeded
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = None
+
+_MB = 1024 * 1024
+
+
+def current_rss():
+    """
+    Returns the current resident set size (RSS) of this process in bytes.
+
+    Reads `/proc/self/statm`, which is cheap enough to be called from a
+    processing loop every few thousand lines.
+
+    Returns:
+        int | None: RSS in bytes, or None if it cannot be determined on this platform.
+    """
+    if _PAGE_SIZE is None:
+        return None
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class ProcessingLimits:
+    """
+    Per-job resource limits applied by file processors.
+
+    A limit of 0 disables it. The defaults (used e.g. by unit tests and
+    offline tools) only bound the size of line chunks; the limits configured
+    for the application are loaded with `from_settings()`.
+
+    Attributes:
+        max_line_length (int): Maximum number of characters in a single line.
+        line_chunk_size (int): Lines longer than this are read and processed
+            in pieces of about this many characters instead of being loaded whole.
+        max_rss_growth (int): Maximum growth of the process RSS, in bytes,
+            while the job runs.
+        max_wall_time (float): Maximum duration of the job, in seconds.
+    """
+
+    def __init__(self, max_line_length=0, line_chunk_size=64 * 1024, max_rss_growth=0, max_wall_time=0):
+        self.max_line_length = max_line_length
+        self.line_chunk_size = line_chunk_size
+        self.max_rss_growth = max_rss_growth
+        self.max_wall_time = max_wall_time
+
+    @classmethod
+    def from_settings(cls):
+        """Returns the limits configured by the `PROCESSING_*` settings."""
+        return cls(
+            max_line_length=settings.PROCESSING_MAX_LINE_LENGTH,
+            line_chunk_size=settings.PROCESSING_LINE_CHUNK_SIZE,
+            max_rss_growth=settings.PROCESSING_MAX_RSS_GROWTH,
+            max_wall_time=settings.PROCESSING_MAX_WALL_TIME,
+        )
+
+
+class ResourceBudget:
+    """
+    Tracks memory and wall time of one processing job against its limits.
+
+    The budget starts when it is created: the current RSS becomes the baseline
+    for the memory growth limit, and the current time the start of the wall time
+    limit. `check()` is called periodically from the processing loop; every call
+    also samples the RSS, so `peak_rss` holds the highest RSS observed while
+    the job ran.
+
+    Args:
+        limits (ProcessingLimits): Limits to enforce.
+    """
+
+    def __init__(self, limits):
+        self.limits = limits
+        self.started_at = time.monotonic()
+        self.baseline_rss = current_rss()
+        self.peak_rss = self.baseline_rss
+
+    def sample(self):
+        """
+        Sample the current RSS and update `peak_rss`.
+
+        Returns:
+            int | None: Current RSS in bytes, or None if unavailable.
+        """
+        rss = current_rss()
+        if rss is not None and (self.peak_rss is None or rss > self.peak_rss):
+            self.peak_rss = rss
+        return rss
+
+    def check(self):
+        """
+        Verify that the job is still within its memory and wall time limits.
+
+        Raises:
+            BudgetExceeded: If a limit has been exceeded.
+        """
+        rss = self.sample()
+        max_rss_growth = self.limits.max_rss_growth
+        if max_rss_growth and rss is not None and self.baseline_rss is not None:
+            growth = rss - self.baseline_rss
+            if growth > max_rss_growth:
+                raise BudgetExceeded(
+                    f"Memory usage grew by {growth / _MB:.0f} MB during processing, "
+                    f"exceeding the limit of {max_rss_growth / _MB:.0f} MB."
+                )
+
+        max_wall_time = self.limits.max_wall_time
+        elapsed = time.monotonic() - self.started_at
+        if max_wall_time and elapsed > max_wall_time:
+            raise BudgetExceeded(
+                f"Processing took longer than the limit of {max_wall_time:g} seconds."
+            )
@@ -1,4 +1,13 @@
 import random
+import re
+from text_processor.exceptions import ResourceLimitExceeded
+
+_LAST_WHITESPACE = re.compile(r'\s\S*\Z')
+# Words that `shuffle_inner_letters` can change: runs of 4+ non-whitespace characters,
+# or of 4+ letters in punctuation-aware mode (digits, underscores and punctuation excluded).
+# Captured, so re.split() returns them at the odd indices between the untouched text.
+_WORD = re.compile(r'(\S{4,})')
+_LETTER_WORD = re.compile(r'([^\W\d_]{4,})')
 
 def shuffle_inner_letters(word: str) -> str:
     """
@@ -36,24 +45,41 @@ def shuffle_inner_letters(word: str) -> str:
 
 
 
-def shuffle_text_line(line: str) -> str:
+def shuffle_text_line(line: str, punctuation_aware: bool = False) -> str:
     """
     Processes a line of text by shuffling the inner letters of each word.
-    Each word in the input line is passed to the `shuffle_inner_letters` function.
+
+    Tabs, runs of spaces and leading or trailing whitespace are kept exactly as
+    they were. Lines whose only whitespace is the plain space (the common case)
+    take a fast path: `str.split(' ')` keeps runs of spaces as empty words, so
+    joining the shuffled words restores the spacing. Other lines, and the
+    punctuation-aware mode, are split with a precompiled pattern so that only
+    words of four or more characters are passed to `shuffle_inner_letters`. Both
+    paths give the same result for the same random state.
 
     Args:
         line (str): A line of text to process.
+        punctuation_aware (bool): If True, words are runs of letters, so punctuation
+            and digits stay in place (`"hello,"` keeps its comma at the end).
+            By default words are whitespace-separated, punctuation included.
 
     Returns:
         str: A new line where each word has its inner letters shuffled,
         maintaining the original word order and spacing between words.
     """
-    return ' '.join(shuffle_inner_letters(word) for word in line.split())
+    if not punctuation_aware and line.isprintable():
+        # Fast path: the only whitespace is ' ', and splitting on single spaces keeps
+        # runs of spaces as empty words, so joining restores the spacing exactly.
+        return ' '.join(map(shuffle_inner_letters, line.split(' ')))
+    pattern = _LETTER_WORD if punctuation_aware else _WORD
+    parts = pattern.split(line)
+    parts[1::2] = map(shuffle_inner_letters, parts[1::2])
+    return ''.join(parts)
 
 
 
 
-from typing import Iterable, Callable, Generator
+from typing import Iterable, Callable, Generator, TextIO
 
 def line_generator(
     infile: Iterable[str],
@@ -79,4 +105,105 @@ def line_generator(
         - Each yielded line includes a newline at the end for easy writing to files.
     """
     for line in infile:
-        yield line_processor(line.rstrip('\n')) + '\n'
\ No newline at end of file
+        yield line_processor(line.rstrip('\n')) + '\n'
+
+
+def line_chunk_generator(
+    infile: TextIO,
+    chunk_size: int,
+    max_line_length: int = 0
+) -> Generator[tuple[str, str], None, None]:
+    """
+    A generator that reads lines from a text stream in pieces of bounded size.
+
+    Regular lines are yielded whole. Lines longer than `chunk_size` are never loaded
+    into memory at once: they are read in chunks and split at the last whitespace
+    character of each chunk, so words are not cut in half. A single "word" longer
+    than `chunk_size` is yielded in `chunk_size` pieces.
+
+    Args:
+        infile (TextIO): An open text stream (for example, a file object).
+        chunk_size (int): Maximum number of characters read at once.
+        max_line_length (int): Maximum allowed line length in characters (0 for no limit).
+
+    Yields:
+        tuple[str, str]: A piece of text (without the trailing newline) and the
+        separator that followed it in the input: `'\n'` at the end of a line,
+        the whitespace character the line was split at, or `''` inside a long word.
+        Writing `process(text) + separator` for every piece reproduces the line layout.
+
+    Raises:
+        ResourceLimitExceeded: If a line is longer than `max_line_length`.
+
+    Notes:
+        - Like `line_generator`, the last line is terminated with a newline even
+          if the input does not end with one.
+        - At most about `2 * chunk_size` characters are held in memory.
+    """
+    carry = ''
+    line_length = 0
+    line_number = 1
+    while True:
+        chunk = infile.readline(chunk_size)
+        if not chunk:
+            # The last line is still open if its final chunk ended without a newline.
+            if carry or line_length:
+                yield carry, '\n'
+            return
+
+        line_length += len(chunk)
+        if max_line_length and line_length - chunk.endswith('\n') > max_line_length:
+            raise ResourceLimitExceeded(
+                f"Line {line_number} is longer than the limit of {max_line_length} characters."
+            )
+
+        if chunk.endswith('\n') or len(chunk) < chunk_size:
+            yield carry + chunk.rstrip('\n'), '\n'
+            carry = ''
+            line_length = 0
+            line_number += 1
+            continue
+
+        text = carry + chunk
+        match = _LAST_WHITESPACE.search(text)
+        if match:
+            cut = match.start()
+            yield text[:cut], text[cut]
+            carry = text[cut + 1:]
+        else:
+            yield text, ''
+            carry = ''
+
+
+def bounded_line_reader(infile: TextIO, max_line_length: int = 0) -> Generator[str, None, None]:
+    """
+    A generator that yields the lines of a text stream, enforcing a maximum line length.
+
+    Each line is read with a size limit, so an oversized line is detected after reading
+    just over `max_line_length` characters instead of being loaded into memory whole.
+    Used for formats whose lines cannot be processed in pieces (e.g. CSV rows).
+
+    Args:
+        infile (TextIO): An open text stream (for example, a file object).
+        max_line_length (int): Maximum allowed line length in characters,
+            excluding the line terminator (0 for no limit).
+
+    Yields:
+        str: Each line, including its line terminator.
+
+    Raises:
+        ResourceLimitExceeded: If a line is longer than `max_line_length`.
+    """
+    if not max_line_length:
+        yield from infile
+        return
+
+    line_number = 1
+    # Leave room for a "\r\n" terminator after a line of exactly max_line_length characters.
+    for line in iter(lambda: infile.readline(max_line_length + 2), ''):
+        if len(line.rstrip('\r\n')) > max_line_length:
+            raise ResourceLimitExceeded(
+                f"Line {line_number} is longer than the limit of {max_line_length} characters."
+            )
+        yield line
+        line_number += 1
@@ -0,0 +1,52 @@
+from typing import List
+
+
+def add_range(ranges: List[List[int]], start: int, end: int) -> List[List[int]]:
+    """
+    Adds the byte range [start, end) to a list of received ranges.
+
+    Overlapping and adjacent ranges are merged, so a fully received file is
+    always described by the single range [0, size), however many chunks it
+    was sent in and in whatever order.
+
+    Args:
+        ranges (list[list[int]]): Sorted, non-overlapping [start, end) pairs.
+        start (int): First byte of the new range.
+        end (int): End (exclusive) of the new range.
+
+    Returns:
+        list[list[int]]: A new sorted list of merged ranges.
+    """
+    merged = []
+    for range_start, range_end in sorted([*ranges, [start, end]]):
+        if merged and range_start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], range_end)
+        else:
+            merged.append([range_start, range_end])
+    return merged
+
+
+def received_bytes(ranges: List[List[int]]) -> int:
+    """Returns the number of bytes covered by the received ranges."""
+    return sum(end - start for start, end in ranges)
+
+
+def missing_chunks(ranges: List[List[int]], total_size: int, chunk_size: int) -> List[int]:
+    """
+    Returns the numbers of the chunks that are not (completely) received yet.
+
+    Args:
+        ranges (list[list[int]]): Sorted, non-overlapping received [start, end) pairs.
+        total_size (int): Size of the whole file in bytes.
+        chunk_size (int): Size of every chunk but the last one.
+
+    Returns:
+        list[int]: Chunk numbers, in ascending order.
+    """
+    missing = []
+    for number in range(-(-total_size // chunk_size)):
+        start = number * chunk_size
+        end = min(start + chunk_size, total_size)
+        if not any(range_start <= start and end <= range_end for range_start, range_end in ranges):
+            missing.append(number)
+    return missing
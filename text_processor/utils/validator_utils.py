@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from text_processor.processors.file_processor_factory import FileProcessorFactory
+from text_processor.utils.pipeline_utils import validate_pipeline
 
 def validate_file_extension(file, allowed_ext=None):
     """
@@ -17,12 +18,32 @@ def validate_file_extension(file, allowed_ext=None):
     Returns:
         file: The original uploaded file if validation succeeds.
     """
-    filename = file.name.lower()
+    validate_filename_extension(file.name, allowed_ext)
+    return file
+
+
+def validate_filename_extension(filename, allowed_ext=None):
+    """
+    Validates that a file name has an allowed file extension.
+    Used by `validate_file_extension` and for uploads that only
+    announce the file name before sending the content.
+
+    Args:
+        filename (str): Name of the file.
+        allowed_ext (list[str], optional): List of allowed file extensions.
+
+    Raises:
+        serializers.ValidationError: If the file extension is not allowed.
+
+    Returns:
+        str: The original file name if validation succeeds.
+    """
+    name = filename.lower()
 
     # Determine extension
-    if '.' not in filename:
+    if '.' not in name:
         raise serializers.ValidationError("The uploaded file has no extension.")
-    ext = '.' + filename.split('.')[-1]
+    ext = '.' + name.split('.')[-1]
 
     # Auto-discover supported extensions from factory if not explicitly provided
     if allowed_ext is None:
@@ -38,4 +59,23 @@ def validate_file_extension(file, allowed_ext=None):
             f"Allowed formats: {', '.join(allowed_ext)}."
         )
 
-    return file
+    return filename
+
+
+def validate_pipeline_stages(pipeline):
+    """
+    Validates a transform pipeline sent by a client.
+
+    Args:
+        pipeline (list[str]): Stage names, in the order they are applied.
+
+    Raises:
+        serializers.ValidationError: If the pipeline is empty or has an unknown stage.
+
+    Returns:
+        list[str]: The stage names.
+    """
+    try:
+        return validate_pipeline(pipeline)
+    except ValueError as e:
+        raise serializers.ValidationError(str(e))
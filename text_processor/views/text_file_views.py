@@ -1,9 +1,22 @@
-from rest_framework import generics
+import logging
+from rest_framework import generics, permissions, status
 from rest_framework.parsers import MultiPartParser
-from text_processor.models.models import TextFile
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from text_processor.models.file_status_choices import FileStatus
+from text_processor.models.models import ProcessingBatch, TextFile
+from text_processor.permissions import IsOwnerOrStaff
+from text_processor.serializers.batch_serializers import BatchUploadSerializer, ProcessingBatchSerializer, \
+    ReprocessFilterSerializer
 from text_processor.serializers.text_file_serializers import TextFileSerializer
+from text_processor.services.batch_services import BatchDispatcher
+from text_processor.services.scheduling_services import FairScheduler
 from text_processor.tasks.tasks import process_file_task
+from text_processor.tracing import tracer
 from django.shortcuts import render
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
 
 def index(request):
     return render(request, 'text_processor/index.html')
@@ -15,8 +28,9 @@ class TextFileUploadView(generics.CreateAPIView):
 
     This endpoint accepts a file upload via multipart/form-data and creates
     a new `TextFile` instance in the database. Once the file is saved,
-    a Celery background task (`process_text_file_task`) is triggered
-    to process the uploaded file asynchronously line by line.
+    it is handed to the `FairScheduler`, which triggers a Celery background
+    task (`process_file_task`) to process the uploaded file asynchronously
+    line by line as soon as the user has a free processing slot.
 
     The processing task will:
         - Shuffle the inner letters of each word in the text file.
@@ -31,24 +45,93 @@ class TextFileUploadView(generics.CreateAPIView):
     Notes:
         - Large files are processed asynchronously to avoid blocking requests.
         - The processing progress and result can be checked via `TextFileDetailView`.
+        - When the processing queue is over its limits, the upload is rejected with
+          `429 Too Many Requests` and a `Retry-After` header.
+        - Every upload starts a trace. Its ID is returned in the `X-Trace-Id` header
+          and the `trace_id` field, and follows the job into the Celery task.
     """
     queryset = TextFile.objects.all()
     serializer_class = TextFileSerializer
     parser_classes = [MultiPartParser]
 
+    def create(self, request, *args, **kwargs):
+        with tracer.trace() as trace_id:
+            with tracer.span('upload'):
+                response = super().create(request, *args, **kwargs)
+        response['X-Trace-Id'] = trace_id
+        return response
+
     def perform_create(self, serializer):
         """
-        Saves the uploaded file and triggers asynchronous Celery processing.
+        Saves the uploaded file and schedules asynchronous Celery processing.
 
         Args:
             serializer (TextFileSerializer): The validated serializer instance.
 
+        Raises:
+            Throttled: If the processing queue is over its limits.
+
         Returns:
             None
         """
-        instance = serializer.save()
-        # Trigger Celery task for background processing
-        process_file_task.delay(instance.id)
+        scheduler = FairScheduler()
+        client_address = scheduler.client_address(self.request)
+        with tracer.span('upload.admission'):
+            scheduler.check_admission(self.request.user, serializer.validated_data['original_file'].size,
+                                      client_address=client_address)
+        with tracer.span('upload.write') as span:
+            instance = serializer.save(trace_id=tracer.get_trace_id(), client_address=client_address)
+            if span:
+                span.attributes['file_id'] = instance.id
+        # Trigger Celery tasks for background processing
+        scheduler.dispatch()
+
+
+class TextFileBatchUploadView(generics.GenericAPIView):
+    """
+    API endpoint for uploading many files in one request.
+
+    Accepts repeated `files` fields (and optionally a `pipeline` applied to all of
+    them) via multipart/form-data. All files are validated first; then their
+    `TextFile` rows are created with a single bulk insert as one processing batch,
+    and dispatched to Celery as a group instead of one broker round trip per file.
+
+    Attributes:
+        serializer_class (Serializer): The serializer used for validation.
+        parser_classes (list): Parser configuration that enables file uploads (multipart).
+
+    Notes:
+        - Responds with `201 Created`, the batch (its aggregate status and progress are
+          available at `ProcessingBatchDetailView`) and the created files.
+        - Invalid files reject the whole request with `400 Bad Request`, with errors
+          keyed by the index of the file.
+        - When the processing queue is over its limits (counting every file of the
+          request), the upload is rejected with `429 Too Many Requests` and a
+          `Retry-After` header.
+        - The files are sent to the workers within the owner's active job limit,
+          like single uploads. If the broker is unavailable, the files stay
+          `pending` and are dispatched later by the periodic batch sweep.
+    """
+    serializer_class = BatchUploadSerializer
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        files = serializer.validated_data['files']
+
+        scheduler = FairScheduler()
+        client_address = scheduler.client_address(request)
+        scheduler.check_admission(request.user, sum(f.size for f in files), count=len(files),
+                                  client_address=client_address)
+        batch = BatchDispatcher().upload(files, user=request.user,
+                                         pipeline=serializer.validated_data.get('pipeline'),
+                                         client_address=client_address)
+
+        data = ProcessingBatchSerializer(batch).data
+        data['files'] = TextFileSerializer(batch.files.order_by('id'), many=True,
+                                           context=self.get_serializer_context()).data
+        return Response(data, status=status.HTTP_201_CREATED)
 
 
 class TextFileDetailView(generics.RetrieveAPIView):
@@ -57,7 +140,7 @@ class TextFileDetailView(generics.RetrieveAPIView):
 
     This endpoint retrieves a single `TextFile` record by its ID,
     allowing the client to:
-        - Check the current processing status (`pending`, `processing`, `done`, or `failed`).
+        - Check the current processing status (`pending`, `processing`, `done`, `failed`, or `cancelled`).
         - Obtain the URL of the processed result file once available.
 
     Attributes:
@@ -67,7 +150,128 @@ class TextFileDetailView(generics.RetrieveAPIView):
     Notes:
         - If processing is not yet finished, the `result_file` field will be `null`.
         - If an error occurs during processing, the `error_message` will contain details.
+        - The `trace_id` field identifies the file's spans in the tracing output.
     """
     queryset = TextFile.objects.all()
     serializer_class = TextFileSerializer
 
+
+class TextFileTraceDetailView(TextFileDetailView):
+    """
+    Same as `TextFileDetailView`, but looks the file up by its trace ID
+    (e.g. the `X-Trace-Id` header returned on upload, or an ID found in the spans).
+    """
+    lookup_field = 'trace_id'
+
+
+class TextFileCancelView(generics.GenericAPIView):
+    """
+    API endpoint for cancelling the processing of a file.
+
+    A `POST` request marks a pending or processing file as `cancelled`:
+        - If the Celery task is still queued, it is revoked and never runs.
+        - If the file is being processed, the processor notices the cancellation
+          at its next checkpoint, stops early, removes its partial output and
+          releases the worker.
+
+    Attributes:
+        queryset (QuerySet): The queryset of all `TextFile` objects.
+        serializer_class (Serializer): The serializer used for output formatting.
+        permission_classes (list): Only the file's owner or staff may cancel it.
+
+    Notes:
+        - Files that are already `done`, `failed` or `cancelled` cannot be cancelled;
+          the endpoint responds with `409 Conflict`.
+        - Anonymous requests are rejected, and other users' files with `403 Forbidden`.
+    """
+    queryset = TextFile.objects.all()
+    serializer_class = TextFileSerializer
+    permission_classes = [IsOwnerOrStaff]
+
+    def post(self, request, *args, **kwargs):
+        text_file = self.get_object()
+
+        cancelled = TextFile.objects.filter(
+            pk=text_file.pk,
+            status__in=[FileStatus.PENDING, FileStatus.PROCESSING],
+        ).update(status=FileStatus.CANCELLED, updated_at=timezone.now())
+        if not cancelled:
+            return Response(
+                {'detail': f"File with status '{text_file.status}' cannot be cancelled."},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        if text_file.task_id:
+            try:
+                process_file_task.app.control.revoke(text_file.task_id)
+            except Exception as e:
+                # The processor still stops at its next cancellation check.
+                logger.warning(f"Could not revoke task {text_file.task_id} for file {text_file.id}: {e}")
+        # The cancelled job no longer occupies a processing slot
+        FairScheduler().dispatch()
+
+        text_file.refresh_from_db()
+        return Response(self.get_serializer(text_file).data)
+
+
+class QueueStatsView(APIView):
+    """
+    API endpoint exposing the current state of the processing queue.
+
+    Returns the number of waiting jobs (accepted, not yet sent to workers),
+    active jobs (sent to workers or being processed) and queued bytes, both
+    globally and for the requesting user, together with the configured
+    admission limits. Clients can use it to pace their uploads instead of
+    running into `429 Too Many Requests` responses. For anonymous requests,
+    the user's counts are those of the client's address.
+    """
+
+    def get(self, request, *args, **kwargs):
+        scheduler = FairScheduler()
+        return Response(scheduler.stats(request.user, scheduler.client_address(request)))
+
+
+class TextFileReprocessView(generics.GenericAPIView):
+    """
+    API endpoint for reprocessing many files at once (e.g. after shuffle behaviour changed).
+
+    A `POST` request with a filter (`ids`, `status`, `user`, `created_after`,
+    `created_before`) resets all matching files with one bulk update and starts
+    a processing batch. The files are sent to the workers in rate-limited Celery
+    groups by the `BatchDispatcher`; the progress of the whole batch is available
+    at `ProcessingBatchDetailView`.
+
+    Attributes:
+        queryset (QuerySet): The queryset of all `TextFile` objects.
+        serializer_class (Serializer): The serializer validating the filter.
+        permission_classes (list): Only staff users may reprocess files.
+
+    Notes:
+        - Files that are still `pending` or `processing` are skipped.
+        - Responds with `202 Accepted` and the new batch.
+    """
+    queryset = TextFile.objects.all()
+    serializer_class = ReprocessFilterSerializer
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        batch = BatchDispatcher().reprocess(
+            serializer.filter_queryset(self.get_queryset()),
+            user=request.user,
+            filters=serializer.data,
+        )
+        return Response(ProcessingBatchSerializer(batch).data, status=status.HTTP_202_ACCEPTED)
+
+
+class ProcessingBatchDetailView(generics.RetrieveAPIView):
+    """
+    API endpoint for checking the progress of a processing batch.
+
+    Returns the batch with the number of its files in each status, the percentage
+    of finished files, and whether the whole batch is finished.
+    """
+    queryset = ProcessingBatch.objects.all()
+    serializer_class = ProcessingBatchSerializer
@@ -0,0 +1,133 @@
+from rest_framework import generics, status
+from rest_framework.response import Response
+from text_processor.models.models import UploadSession
+from text_processor.permissions import IsOwnerOrStaff
+from text_processor.serializers.text_file_serializers import TextFileSerializer
+from text_processor.serializers.upload_serializers import UploadSessionSerializer
+from text_processor.services.scheduling_services import FairScheduler
+from text_processor.services.upload_services import ChunkedUploadService
+from text_processor.tracing import tracer
+
+
+class UploadSessionCreateView(generics.CreateAPIView):
+    """
+    API endpoint for starting a resumable upload.
+
+    The client announces the `filename`, the `total_size` in bytes and optionally
+    the transform `pipeline`. The response contains the session `id` and the
+    `chunk_size` the file must be sent in (see `UploadChunkView`).
+
+    Attributes:
+        queryset (QuerySet): The queryset of all `UploadSession` objects.
+        serializer_class (Serializer): The serializer used for validation and creation.
+        permission_classes (list): Only authenticated users may upload in chunks,
+            and only the session's owner (or staff) may use the session afterwards.
+
+    Notes:
+        - Unsupported file extensions are rejected before any data is sent.
+        - Sessions that receive no chunk for `UPLOAD_SESSION_EXPIRY` seconds are
+          aborted by a periodic cleanup task.
+        - When the processing queue is over its limits, the session is rejected with
+          `429 Too Many Requests` and a `Retry-After` header.
+    """
+    queryset = UploadSession.objects.all()
+    serializer_class = UploadSessionSerializer
+    permission_classes = [IsOwnerOrStaff]
+
+    def perform_create(self, serializer):
+        FairScheduler().check_admission(self.request.user, serializer.validated_data['total_size'])
+        session = serializer.save()
+        ChunkedUploadService(session).start()
+
+
+class UploadSessionDetailView(generics.RetrieveDestroyAPIView):
+    """
+    API endpoint for checking or aborting a resumable upload.
+
+    `GET` returns the byte ranges received so far (`received`) and the numbers of
+    the chunks still missing (`missing_chunks`), so a client can resume after a
+    dropped connection. `DELETE` aborts the upload and removes the received data.
+
+    Attributes:
+        queryset (QuerySet): The queryset of all `UploadSession` objects.
+        serializer_class (Serializer): The serializer used for output formatting.
+    """
+    queryset = UploadSession.objects.all()
+    serializer_class = UploadSessionSerializer
+    permission_classes = [IsOwnerOrStaff]
+
+    def perform_destroy(self, instance):
+        ChunkedUploadService(instance).abort()
+
+
+class UploadChunkView(generics.GenericAPIView):
+    """
+    API endpoint for sending one chunk of a resumable upload.
+
+    `PUT /uploads/<id>/chunks/<number>/` with the raw chunk bytes as the body.
+    Chunk N covers the bytes from N * chunk_size up to the next chunk (the last
+    chunk may be shorter). An optional `Content-Range: bytes <first>-<last>/<total>`
+    header is checked against these offsets. Chunks can be sent in any order,
+    in parallel, and resent; each request only lasts for one chunk.
+
+    Attributes:
+        queryset (QuerySet): The queryset of all `UploadSession` objects.
+        serializer_class (Serializer): The serializer used for output formatting.
+
+    Notes:
+        - Responds with the updated session (received ranges and missing chunks).
+        - A chunk with the wrong length is rejected with `400 Bad Request`; a chunk
+          for a session that is (or meanwhile gets) finalized or aborted with `409 Conflict`.
+    """
+    queryset = UploadSession.objects.all()
+    serializer_class = UploadSessionSerializer
+    permission_classes = [IsOwnerOrStaff]
+
+    def put(self, request, *args, **kwargs):
+        session = self.get_object()
+        if session.text_file_id:
+            return Response({'detail': "The upload has already been finalized."}, status=status.HTTP_409_CONFLICT)
+
+        try:
+            content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            content_length = None
+        ChunkedUploadService(session).write_chunk(
+            kwargs['number'], request.stream, content_length, request.headers.get('Content-Range'),
+        )
+        return Response(self.get_serializer(session).data)
+
+
+class UploadSessionFinalizeView(generics.GenericAPIView):
+    """
+    API endpoint for completing a resumable upload.
+
+    Once all chunks are received, a `POST` creates the `TextFile` from the staged
+    data and queues it for processing, exactly like `TextFileUploadView`. The
+    response is the new file (`201 Created`, with its trace ID in the `X-Trace-Id`
+    header); finalizing the same session again returns the same file.
+
+    Attributes:
+        queryset (QuerySet): The queryset of all `UploadSession` objects.
+        serializer_class (Serializer): The serializer used for output formatting.
+
+    Notes:
+        - An incomplete upload is rejected with `400 Bad Request`.
+        - When the processing queue is over its limits, the request is rejected with
+          `429 Too Many Requests`; the session stays open and can be finalized later.
+    """
+    queryset = UploadSession.objects.all()
+    serializer_class = TextFileSerializer
+    permission_classes = [IsOwnerOrStaff]
+
+    def post(self, request, *args, **kwargs):
+        session = self.get_object()
+        with tracer.trace(), tracer.span('upload', upload_session=str(session.id)):
+            text_file, created = ChunkedUploadService(session).finalize()
+
+        response = Response(
+            self.get_serializer(text_file).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+        response['X-Trace-Id'] = text_file.trace_id
+        return response
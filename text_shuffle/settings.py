@@ -97,3 +97,71 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Celery
 CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://redis:6379/0')
 CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', 'redis://redis:6379/0')
+# Recycle a worker child process after a task leaves it above this RSS (KiB) or after
+# this many tasks, so memory kept by one huge job is returned to the OS (0 disables)
+CELERY_WORKER_MAX_MEMORY_PER_CHILD = int(os.getenv('CELERY_WORKER_MAX_MEMORY_PER_CHILD', 1024 * 1024)) or None
+CELERY_WORKER_MAX_TASKS_PER_CHILD = int(os.getenv('CELERY_WORKER_MAX_TASKS_PER_CHILD', 0)) or None
+
+# Resumable chunked uploads: chunk size and maximum file size in bytes (0 disables the limit)
+UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024))
+UPLOAD_MAX_SIZE = int(os.getenv('UPLOAD_MAX_SIZE', 20 * 1024 ** 3))
+# Seconds without a received chunk after which an unfinished upload session is aborted (0 disables)
+UPLOAD_SESSION_EXPIRY = int(os.getenv('UPLOAD_SESSION_EXPIRY', 24 * 3600))
+
+# ZIP archive processing
+ZIP_PROCESSOR_MAX_WORKERS = int(os.getenv('ZIP_PROCESSOR_MAX_WORKERS', 4))
+ZIP_PROCESSOR_SPOOL_MAX_SIZE = int(os.getenv('ZIP_PROCESSOR_SPOOL_MAX_SIZE', 8 * 1024 * 1024))
+
+# Admission control and fair scheduling of processing jobs (0 disables a limit)
+PROCESSING_MAX_ACTIVE_JOBS_PER_USER = int(os.getenv('PROCESSING_MAX_ACTIVE_JOBS_PER_USER', 2))
+PROCESSING_MAX_QUEUED_BYTES_PER_USER = int(os.getenv('PROCESSING_MAX_QUEUED_BYTES_PER_USER', 2 * 1024 ** 3))
+PROCESSING_MAX_QUEUE_DEPTH = int(os.getenv('PROCESSING_MAX_QUEUE_DEPTH', 10000))
+PROCESSING_MAX_QUEUED_BYTES = int(os.getenv('PROCESSING_MAX_QUEUED_BYTES', 20 * 1024 ** 3))
+PROCESSING_RETRY_AFTER = int(os.getenv('PROCESSING_RETRY_AFTER', 30))  # seconds
+# Anonymous jobs are scheduled per client address. Number of reverse proxies in front of the
+# app whose X-Forwarded-For entries are trusted (0 uses the connection's address)
+REST_FRAMEWORK = {
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
+}
+# Seconds between periodic dispatches, and after which a job still `processing` counts as
+# lost (must exceed PROCESSING_MAX_WALL_TIME; 0 disables the recovery)
+PROCESSING_DISPATCH_INTERVAL = float(os.getenv('PROCESSING_DISPATCH_INTERVAL', 30))
+PROCESSING_STALE_TIMEOUT = int(os.getenv('PROCESSING_STALE_TIMEOUT', 2 * 3600))
+
+# Resource limits of a single processing job (0 disables a limit)
+PROCESSING_MAX_LINE_LENGTH = int(os.getenv('PROCESSING_MAX_LINE_LENGTH', 16 * 1024 * 1024))  # characters
+PROCESSING_LINE_CHUNK_SIZE = int(os.getenv('PROCESSING_LINE_CHUNK_SIZE', 64 * 1024))  # characters
+PROCESSING_MAX_RSS_GROWTH = int(os.getenv('PROCESSING_MAX_RSS_GROWTH', 512 * 1024 * 1024))  # bytes
+PROCESSING_MAX_WALL_TIME = int(os.getenv('PROCESSING_MAX_WALL_TIME', 3600))  # seconds
+
+# Bulk reprocessing: files per Celery group, seconds between groups, and maximum
+# queued or processing files per batch (0 disables the in-flight limit)
+BATCH_DISPATCH_CHUNK_SIZE = int(os.getenv('BATCH_DISPATCH_CHUNK_SIZE', 100))
+BATCH_DISPATCH_INTERVAL = float(os.getenv('BATCH_DISPATCH_INTERVAL', 1.0))
+BATCH_MAX_IN_FLIGHT = int(os.getenv('BATCH_MAX_IN_FLIGHT', 500))
+# Seconds without a dispatch run after which the periodic sweep restarts a batch with waiting files
+BATCH_DISPATCH_STALE_AFTER = int(os.getenv('BATCH_DISPATCH_STALE_AFTER', 60))
+
+# Maximum number of files in one batch upload request
+BATCH_UPLOAD_MAX_FILES = int(os.getenv('BATCH_UPLOAD_MAX_FILES', 1000))
+DATA_UPLOAD_MAX_NUMBER_FILES = BATCH_UPLOAD_MAX_FILES
+
+# Periodic tasks run by `celery beat`
+CELERY_BEAT_SCHEDULE = {
+    'dispatch-pending-files': {
+        'task': 'text_processor.tasks.tasks.dispatch_pending_task',
+        'schedule': PROCESSING_DISPATCH_INTERVAL,
+    },
+    'sweep-processing-batches': {
+        'task': 'text_processor.tasks.tasks.sweep_batches_task',
+        'schedule': PROCESSING_DISPATCH_INTERVAL,
+    },
+    'cleanup-upload-sessions': {
+        'task': 'text_processor.tasks.tasks.cleanup_upload_sessions_task',
+        'schedule': 3600,
+    },
+}
+
+# Tracing (use 'text_processor.tracing.exporters.JsonLinesSpanExporter' to write spans to TRACING_JSONL_PATH)
+TRACING_EXPORTER = os.getenv('TRACING_EXPORTER', 'text_processor.tracing.exporters.NullSpanExporter')
+TRACING_JSONL_PATH = os.getenv('TRACING_JSONL_PATH', BASE_DIR / 'traces' / 'spans.jsonl')
@@ -0,0 +1,27 @@
+"""
+Settings for running `manage.py loadtest` on a single machine without external services.
+
+Uses a local SQLite database and an in-memory Celery broker instead of PostgreSQL
+and Redis. Run the load test with:
+
+    python manage.py loadtest --settings=text_shuffle.settings_loadtest
+"""
+
+from .settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv('LOADTEST_DATABASE', BASE_DIR / 'loadtest.sqlite3'),
+        # Concurrent clients and the worker write to the same file.
+        'OPTIONS': {'timeout': 30},
+    }
+}
+
+CELERY_BROKER_URL = 'memory://'
+CELERY_RESULT_BACKEND = 'cache+memory://'
+# The in-memory transport polls for messages; the default 1s interval would dominate queue wait.
+CELERY_BROKER_TRANSPORT_OPTIONS = {'polling_interval': 0.01}
+
+# All load-test clients upload anonymously from the same address, i.e. as a single client.
+PROCESSING_MAX_ACTIVE_JOBS_PER_USER = 0